@@ -1,5 +1,9 @@
 import random
 
+# Bound once at import: repeated module-attribute lookups on the hot path
+# add up when these mocks are driven in bulk from dry runs.
+_rand = random.Random().random
+
 def vt_hash_result(hashes):
     """
     Mock VirusTotal hash lookup result
@@ -11,8 +15,8 @@ def vt_hash_result(hashes):
         dict: Mock result with any_malicious, max_score, and total_lookups
     """
     return {
-        "any_malicious": random.random() < 0.3,
-        "max_score": int(random.random() * 100),
+        "any_malicious": _rand() < 0.3,
+        "max_score": int(_rand() * 100),
         "total_lookups": len(hashes or [])
     }
 
@@ -27,8 +31,8 @@ def vt_url_result(urls):
         dict: Mock result with any_malicious, max_score, and urls_checked
     """
     return {
-        "any_malicious": random.random() < 0.5,
-        "max_score": int(random.random() * 100),
+        "any_malicious": _rand() < 0.5,
+        "max_score": int(_rand() * 100),
         "urls_checked": len(urls or [])
     }
 
@@ -43,7 +47,7 @@ def abuseipdb_result(ip):
         dict: Mock result with score, country, asn, and ip
     """
     return {
-        "score": int(random.random() * 100),
+        "score": int(_rand() * 100),
         "country": "US",
         "asn": "AS15169",
         "ip": ip
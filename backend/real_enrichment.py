@@ -0,0 +1,73 @@
+"""Real enrichment API clients.
+
+Used by the dry-run handler when USE_REAL_ENRICHMENT_API=true; the mock
+results in mock_enrichment stay the default. Lookups are batched: callers
+hand over every distinct indicator at once and the requests go out
+concurrently over one shared connection pool, so N indicators cost one
+TLS handshake and roughly max(latency) instead of the sum.
+"""
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+try:
+    import httpx  # optional: only needed when USE_REAL_ENRICHMENT_API=true
+except ImportError:
+    httpx = None
+
+_ABUSEIPDB_URL = "https://api.abuseipdb.com/api/v2/check"
+# AbuseIPDB rate-limits aggressively; cap in-flight requests per batch.
+_MAX_CONCURRENCY = 10
+
+_client: Optional["httpx.AsyncClient"] = None
+
+def _get_client() -> "httpx.AsyncClient":
+    """Lazily create one AsyncClient shared by all batches (keeps the
+    connection pool warm across dry runs)."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=10.0)
+    return _client
+
+async def _abuseipdb_check(ip: str, sem: asyncio.Semaphore, headers: Dict[str, str]):
+    async with sem:
+        resp = await _get_client().get(
+            _ABUSEIPDB_URL,
+            params={"ipAddress": ip, "maxAgeInDays": 90},
+            headers=headers,
+        )
+        resp.raise_for_status()
+        data = resp.json().get("data", {})
+        return ip, {
+            "score": data.get("abuseConfidenceScore", 0),
+            "country": data.get("countryCode", ""),
+            "asn": data.get("isp", ""),
+            "ip": ip,
+        }
+
+async def abuseipdb_batch(ips: List[str]) -> Dict[str, dict]:
+    """Look up every distinct IP in one concurrent batch.
+
+    Args:
+        ips: IP address strings; duplicates are collapsed.
+
+    Returns:
+        dict: ip -> result dict shaped like mock_enrichment.abuseipdb_result.
+    """
+    if httpx is None:
+        raise RuntimeError(
+            "httpx is required for real enrichment lookups; install it with "
+            "'pip install httpx' or unset USE_REAL_ENRICHMENT_API"
+        )
+    unique = list(dict.fromkeys(ips))
+    if not unique:
+        return {}
+    headers = {
+        "Key": os.getenv("ABUSEIPDB_API_KEY", ""),
+        "Accept": "application/json",
+    }
+    sem = asyncio.Semaphore(_MAX_CONCURRENCY)
+    pairs = await asyncio.gather(
+        *(_abuseipdb_check(ip, sem, headers) for ip in unique)
+    )
+    return dict(pairs)
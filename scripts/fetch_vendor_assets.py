@@ -0,0 +1,41 @@
+"""Mirror the pinned third-party scripts used by the web UI.
+
+Downloads the React, Babel and Tailwind bundles referenced by src/web.py
+into static/vendor/ so the pages can serve them locally with immutable
+cache headers instead of hitting unpkg/cdn.tailwindcss.com from every
+browser. Safe to re-run; existing files are overwritten with the pinned
+versions. The app falls back to the CDN URLs for any file that is missing.
+"""
+import sys
+import urllib.request
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parents[1] / "static" / "vendor"
+
+# Keep filenames in sync with _VENDOR_SCRIPTS in src/web.py. Both React
+# channels are mirrored so MINI_SOAR_ENV=development works offline too.
+ASSETS = {
+    "react-18.production.min.js": "https://unpkg.com/react@18.3.1/umd/react.production.min.js",
+    "react-dom-18.production.min.js": "https://unpkg.com/react-dom@18.3.1/umd/react-dom.production.min.js",
+    "react-18.development.js": "https://unpkg.com/react@18.3.1/umd/react.development.js",
+    "react-dom-18.development.js": "https://unpkg.com/react-dom@18.3.1/umd/react-dom.development.js",
+    "babel-standalone.min.js": "https://unpkg.com/@babel/standalone@7.25.6/babel.min.js",
+    "tailwind.js": "https://cdn.tailwindcss.com/3.4.10",
+}
+
+def main() -> int:
+    VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    failed = False
+    for filename, url in ASSETS.items():
+        target = VENDOR_DIR / filename
+        try:
+            with urllib.request.urlopen(url, timeout=60) as resp:
+                target.write_bytes(resp.read())
+            print(f"[OK] {filename} ({target.stat().st_size} bytes)")
+        except OSError as e:
+            print(f"[FAIL] {filename}: {e}")
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
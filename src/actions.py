@@ -1,20 +1,37 @@
+import logging
 from typing import Dict, Any
 from .connectors import firewall, edr
 
-def execute(action_name: str, alert: Dict[str, Any], params: Dict[str, Any]) -> None:
-    if action_name == "firewall_block_ip":
-        ip_field = params.get("ip_field", "src_ip")
-        ip = alert.get(ip_field)
-        if ip:
-            firewall.block_ip(ip, reason=f"Rule-based action for alert {alert.get('id')}")
-        else:
-            print(f"⚠️ [Action] Missing field '{ip_field}' in alert {alert.get('id')}")
-    elif action_name == "edr_isolate_host":
-        host_field = params.get("host_field", "machine")
-        host = alert.get(host_field)
-        if host:
-            edr.isolate_host(host, note=f"Rule-based action for alert {alert.get('id')}")
-        else:
-            print(f"⚠️ [Action] Missing field '{host_field}' in alert {alert.get('id')}")
+log = logging.getLogger(__name__)
+
+_DEFAULT_IP_FIELD = "src_ip"
+_DEFAULT_HOST_FIELD = "machine"
+
+async def _do_firewall_block_ip(alert: Dict[str, Any], params: Dict[str, Any]) -> None:
+    ip_field = params.get("ip_field", _DEFAULT_IP_FIELD)
+    ip = alert.get(ip_field)
+    if ip:
+        # Build the reason string only when the action actually fires.
+        await firewall.block_ip(ip, reason=f"Rule-based action for alert {alert.get('id')}")
+    else:
+        log.warning("[Action] Missing field '%s' in alert %s", ip_field, alert.get("id"))
+
+async def _do_edr_isolate_host(alert: Dict[str, Any], params: Dict[str, Any]) -> None:
+    host_field = params.get("host_field", _DEFAULT_HOST_FIELD)
+    host = alert.get(host_field)
+    if host:
+        await edr.isolate_host(host, note=f"Rule-based action for alert {alert.get('id')}")
     else:
-        print(f"⚠️ [Action] Unknown action '{action_name}'")
+        log.warning("[Action] Missing field '%s' in alert %s", host_field, alert.get("id"))
+
+_DISPATCH = {
+    "firewall_block_ip": _do_firewall_block_ip,
+    "edr_isolate_host": _do_edr_isolate_host,
+}
+
+async def execute(action_name: str, alert: Dict[str, Any], params: Dict[str, Any]) -> None:
+    handler = _DISPATCH.get(action_name)
+    if handler is None:
+        log.warning("[Action] Unknown action '%s'", action_name)
+        return
+    await handler(alert, params)
@@ -1,25 +1,55 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI
 from typing import List, Dict, Any
 from pathlib import Path
-from .rules import load_rules, evaluate
+from .rules import load_rules, evaluate_batch, intern_keys
 from .actions import execute
+from .logging_config import setup_queue_logging
 
-app = FastAPI(title="Morpheus-Lite SOAR API")
+try:
+    from fastapi.responses import ORJSONResponse as _ResponseClass
+    import orjson  # noqa: F401  (ORJSONResponse needs it at render time)
+except ImportError:
+    from fastapi.responses import JSONResponse as _ResponseClass
+
+setup_queue_logging()
+log = logging.getLogger(__name__)
+app = FastAPI(title="Morpheus-Lite SOAR API", default_response_class=_ResponseClass)
 RULES = load_rules(str(Path(__file__).resolve().parents[1] / "config" / "rules.yaml"))
+# Rule evaluation is CPU-bound pure Python; run it off the event loop so
+# large batches don't stall concurrent requests. RULES is read-only here.
+EXEC = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 5))
 
 @app.get("/")
 def health():
     return {"ok": True}
 
 @app.post("/ingest")
-def ingest(alerts: List[Dict[str, Any]]):
+async def ingest(alerts: List[Dict[str, Any]]):
+    # Interned alert keys compare by identity against the rule engine's
+    # literal keys during condition checks.
+    alerts = intern_keys(alerts)
     results = []
-    for alert in alerts:
-        hits = evaluate(RULES, alert)
+    coros = []
+    loop = asyncio.get_running_loop()
+    batch_hits = await loop.run_in_executor(EXEC, evaluate_batch, RULES, alerts)
+    for alert, hits in zip(alerts, batch_hits):
         actions = []
         for rule in hits:
-            for step in rule.get("then", []):
-                execute(step.get("action"), alert, step.get("params", {}))
+            for step in rule.actions:
+                coros.append(execute(step.get("action"), alert, step.get("params", {})))
                 actions.append(step.get("action"))
-        results.append({"alert_id": alert.get("id"), "matched_rules": [h["name"] for h in hits], "actions": actions})
+        results.append({"alert_id": alert.get("id"), "matched_rules": [h.name for h in hits], "actions": actions})
+    if coros:
+        # Connector calls are I/O-bound once real integrations land; run
+        # them concurrently instead of serially per alert. One failed
+        # action must not fail the whole batch, but it must not vanish
+        # either — log every exception gather collected.
+        outcomes = await asyncio.gather(*coros, return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                log.error("[Ingest] Action failed: %s", outcome)
     return {"results": results}
@@ -1,4 +1,7 @@
+import logging
 from typing import Optional
 
-def isolate_host(hostname: str, note: Optional[str] = None) -> None:
-    print(f"[EDR] Isolated host {hostname} {f'({note})' if note else ''}")
+log = logging.getLogger(__name__)
+
+async def isolate_host(hostname: str, note: Optional[str] = None) -> None:
+    log.info("[EDR] Isolated host %s note=%s", hostname, note)
@@ -1,4 +1,7 @@
+import logging
 from typing import Optional
 
-def block_ip(ip: str, reason: Optional[str] = None) -> None:
-    print(f"[FIREWALL] Blocked IP {ip} {f'({reason})' if reason else ''}")
+log = logging.getLogger(__name__)
+
+async def block_ip(ip: str, reason: Optional[str] = None) -> None:
+    log.info("[FIREWALL] Blocked IP %s reason=%s", ip, reason)
@@ -0,0 +1,31 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_queue_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """Route log records through a queue so hot paths only enqueue.
+
+    Installs a QueueHandler on the root logger and starts a background
+    QueueListener that writes to stderr, keeping stdout I/O off the
+    request critical path. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    output_handler = logging.StreamHandler()
+    output_handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, output_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
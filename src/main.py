@@ -1,27 +1,44 @@
-import json
+import asyncio
+import logging
 from pathlib import Path
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 from typing import Any, Dict, List
 from .rules import load_rules, evaluate
 from .actions import execute
 
 ROOT = Path(__file__).resolve().parents[1]
+log = logging.getLogger(__name__)
 
-def run(alerts_path: Path, rules_path: Path) -> None:
+async def run(alerts_path: Path, rules_path: Path) -> None:
     rules = load_rules(str(rules_path))
-    alerts: List[Dict[str, Any]] = json.loads(alerts_path.read_text(encoding="utf-8"))
+    alerts: List[Dict[str, Any]] = _json.loads(alerts_path.read_bytes())
 
     for alert in alerts:
         hits = evaluate(rules, alert)
         if not hits:
             print(f"[INFO] Alert {alert.get('id')} matched no rules.")
             continue
+        coros = []
         for rule in hits:
-            print(f"[OK] Alert {alert.get('id')} matched rule: {rule.get('name')}")
-            for step in rule.get("then", []):
-                execute(step.get("action"), alert, step.get("params", {}))
+            print(f"[OK] Alert {alert.get('id')} matched rule: {rule.name}")
+            for step in rule.actions:
+                coros.append(execute(step.get("action"), alert, step.get("params", {})))
+        if coros:
+            # Keep processing the remaining alerts if an action fails,
+            # but surface each collected exception instead of dropping it.
+            outcomes = await asyncio.gather(*coros, return_exceptions=True)
+            for outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    log.error("[Run] Action failed: %s", outcome)
 
 if __name__ == "__main__":
-    run(
+    from .logging_config import setup_queue_logging
+    setup_queue_logging()
+    asyncio.run(run(
         alerts_path=ROOT / "alerts.json",
         rules_path=ROOT / "config" / "rules.yaml",
-    )
+    ))
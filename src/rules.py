@@ -1,7 +1,246 @@
-from typing import List, Dict, Any
+from functools import partial
+from typing import Callable, List, Dict, Any
+import operator as op
+import os
+import pickle
+import sys
 import yaml
 
-def load_rules(path: str) -> List[Dict[str, Any]]:
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import ahocorasick  # optional: single-pass multi-pattern substring scan
+except ImportError:
+    ahocorasick = None
+
+def _numeric_op(compare: Callable[[float, float], bool]) -> Callable[[Any], Callable[[Any], bool]]:
+    """Build a numeric comparator factory that coerces the rule value once."""
+    def make(value: Any) -> Callable[[Any], bool]:
+        try:
+            target = float(value)
+        except (ValueError, TypeError):
+            return lambda alert_value: False
+        def comparator(alert_value: Any) -> bool:
+            # Fast path: alert values are usually already numeric, so skip
+            # the float() coercion and exception machinery for them.
+            kind = type(alert_value)
+            if kind is int or kind is float:
+                return compare(alert_value, target)
+            try:
+                return compare(float(alert_value), target)
+            except (ValueError, TypeError):
+                return False
+        return comparator
+    return make
+
+def _contains_op(value: Any) -> Callable[[Any], bool]:
+    if not isinstance(value, str):
+        return lambda alert_value: False
+    return lambda alert_value: isinstance(alert_value, str) and value in alert_value
+
+# Operator name -> factory producing a comparator with the rule value captured.
+# The equality comparators are functools.partial over operator.eq/ne: both are
+# C-implemented, so each check is one call with no Python frame. The numeric
+# comparators bind operator.gt/lt/ge/le inside the coercion wrapper.
+OPS: Dict[str, Callable[[Any], Callable[[Any], bool]]] = {
+    "equals": lambda value: partial(op.eq, value),
+    "not_equals": lambda value: partial(op.ne, value),
+    "greater_than": _numeric_op(op.gt),
+    "less_than": _numeric_op(op.lt),
+    "greater_than_or_equal": _numeric_op(op.ge),
+    "less_than_or_equal": _numeric_op(op.le),
+    "contains": _contains_op,
+}
+
+_NEVER = lambda alert, field_cache: False
+_MISSING = object()
+
+def intern_keys(obj: Any) -> Any:
+    """Recursively intern string dict keys in parsed rule/alert data.
+
+    Interned keys hit CPython's identity fast path on dict lookup, so
+    keys parsed from YAML/JSON compare by pointer against the literal
+    keys used on the hot path instead of by string content.
+    """
+    if obj.__class__ is dict:
+        return {sys.intern(k) if type(k) is str else k: intern_keys(v) for k, v in obj.items()}
+    if obj.__class__ is list:
+        return [intern_keys(v) for v in obj]
+    return obj
+
+def _parse_path(field: str) -> tuple:
+    """Parse a condition field name into a tuple of path parts."""
+    if field.startswith("alert."):
+        return tuple(field[len("alert."):].split("."))
+    return (field,)
+
+def _walk_path(alert: Dict[str, Any], path: tuple) -> Any:
+    value = alert
+    for part in path:
+        value = value.get(part) if value.__class__ is dict else None
+        if value is None:
+            break
+    return value
+
+class _ContainsGroup:
+    """Shared scan for several contains conditions targeting one field.
+
+    The field text is scanned once per alert for all patterns in the
+    group, so each member condition reduces to a set membership check.
+    Uses an Aho-Corasick automaton when pyahocorasick is installed,
+    otherwise a plain substring sweep over the pattern list.
+    """
+    __slots__ = ("path", "patterns", "automaton")
+
+    def __init__(self, path: tuple, patterns: List[str]):
+        self.path = path
+        self.patterns = patterns
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for pattern in patterns:
+                automaton.add_word(pattern, pattern)
+            automaton.make_automaton()
+            self.automaton = automaton
+        else:
+            self.automaton = None
+
+    def matches(self, text: Any) -> frozenset:
+        if type(text) is not str:
+            return frozenset()
+        if self.automaton is not None:
+            return frozenset(found for _, found in self.automaton.iter(text))
+        return frozenset(p for p in self.patterns if p in text)
+
+def _install_contains_groups(rules: List[Dict[str, Any]]) -> None:
+    """Group contains conditions that share a field into one scanner.
+
+    Conditions in a group get a _contains_group reference that
+    _compile_condition turns into a cached set-membership check instead
+    of an independent substring search per condition.
+    """
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for rule in rules:
+        conditions = rule.get("conditions", {})
+        for group_name in ("all", "any"):
+            members = conditions.get(group_name)
+            if not isinstance(members, list):
+                continue
+            for condition in members:
+                if (isinstance(condition, dict)
+                        and condition.get("operator") == "contains"
+                        and isinstance(condition.get("value"), str)):
+                    path = _parse_path(condition.get("field", ""))
+                    groups.setdefault(path, []).append(condition)
+
+    for path, conditions in groups.items():
+        if len(conditions) < 2:
+            continue
+        patterns = sorted({c["value"] for c in conditions})
+        shared = _ContainsGroup(path, patterns)
+        for condition in conditions:
+            condition["_contains_group"] = shared
+
+def _compile_condition(condition: Dict[str, Any]) -> Callable[[Dict[str, Any], Dict[Any, Any]], bool]:
+    """Compile a condition dict into a callable (alert, field_cache) -> bool.
+
+    The dotted field path is parsed once and captured as a tuple, and the
+    operator string is resolved to a comparator closure up front, so the
+    per-alert hot path does no string parsing or operator dispatch.
+    Nested path walks memoize their extracted value in field_cache, which
+    is shared across all rules evaluated against one alert.
+    """
+    field = condition.get("field", "")
+    operator = condition.get("operator", "")
+    value = condition.get("value")
+
+    shared = condition.get("_contains_group")
+    if shared is not None:
+        cache_key = ("__contains__", shared.path)
+        def evaluate_shared_contains(alert: Dict[str, Any], field_cache: Dict[Any, Any]) -> bool:
+            found = field_cache.get(cache_key)
+            if found is None:
+                found = shared.matches(_walk_path(alert, shared.path))
+                field_cache[cache_key] = found
+            return value in found
+        return evaluate_shared_contains
+
+    comparator_factory = OPS.get(operator)
+    if comparator_factory is None:
+        # Unknown operator, never matches
+        return _NEVER
+    comparator = comparator_factory(value)
+
+    path = _parse_path(field)
+
+    if len(path) == 1:
+        key = path[0]
+        def evaluate_flat(alert: Dict[str, Any], field_cache: Dict[Any, Any]) -> bool:
+            return comparator(alert.get(key))
+        return evaluate_flat
+
+    def evaluate_nested(alert: Dict[str, Any], field_cache: Dict[Any, Any]) -> bool:
+        value = field_cache.get(path, _MISSING)
+        if value is _MISSING:
+            value = alert
+            for part in path:
+                # `__class__ is dict` beats isinstance() for the common case
+                value = value.get(part) if value.__class__ is dict else None
+                if value is None:
+                    break
+            field_cache[path] = value
+        return comparator(value)
+    return evaluate_nested
+
+def _compile_rule(rule: Dict[str, Any]) -> None:
+    """Attach precompiled condition callables to a rule dict in place.
+
+    Stores a single ("all" | "any", [callables]) tuple under "_compiled"
+    so matching needs just one dict lookup per rule.
+    """
+    conditions = rule.get("conditions", {})
+    for group in ("all", "any"):
+        if group in conditions:
+            members = conditions[group]
+            if isinstance(members, list):
+                compiled = [_compile_condition(c) for c in members]
+            else:
+                compiled = [_NEVER]
+            rule["_compiled"] = (group, compiled)
+            return
+
+class CompiledRule:
+    """Immutable, slotted view of a rule prepared for the hot path.
+
+    Attribute access is a direct slot fetch instead of a dict probe, and
+    the per-rule working set is much smaller than a dict of dicts. The
+    original rule mapping stays reachable through .spec, and get() /
+    subscripting delegate to it so rule consumers that still treat rules
+    as mappings keep working.
+    """
+    __slots__ = ("name", "compiled", "actions", "mitre", "stop", "priority", "spec")
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.name = spec.get("name")
+        self.priority = spec.get("priority", 0)
+        self.stop = spec.get("stop", False)
+        self.actions = tuple(spec.get("actions") or ())
+        self.mitre = tuple(spec.get("mitre") or ())
+        self.compiled = spec.get("_compiled")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.spec.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.spec[key]
+
+    def __repr__(self) -> str:
+        return f"CompiledRule({self.name!r})"
+
+def load_rules(path: str) -> tuple:
     """Load rules from YAML file with new format:
     rules:
       - name: rule_name
@@ -14,120 +253,226 @@ def load_rules(path: str) -> List[Dict[str, Any]]:
           - action: firewall.block_ip
         mitre:
           - T1110
-    """
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
-    return data.get("rules", [])
 
-def evaluate_condition(condition: Dict[str, Any], alert: Dict[str, Any]) -> bool:
-    """Evaluate a single condition against an alert.
-    
-    Args:
-        condition: Dict with 'field', 'operator', 'value'
-        alert: Alert data dict
-        
-    Returns:
-        bool: True if condition matches
+    Conditions are precompiled into closures at load time so that
+    matching alerts does no per-call parsing or operator dispatch.
+
+    The parsed YAML is cached in a sibling pickle file keyed on the YAML
+    file's mtime and size, so warm starts skip the YAML parse entirely.
+    Set SOAR_RULES_CACHE=0 to disable the cache.
     """
-    field = condition.get("field", "")
-    operator = condition.get("operator", "")
-    value = condition.get("value")
-    
-    # Extract field value from alert (support nested paths like alert.type)
-    if field.startswith("alert."):
-        field_path = field.replace("alert.", "").split(".")
-        alert_value = alert
-        for part in field_path:
-            if isinstance(alert_value, dict) and part in alert_value:
-                alert_value = alert_value[part]
-            else:
-                alert_value = None
-                break
-    else:
-        alert_value = alert.get(field)
-    
-    # Apply operator
-    if operator == "equals":
-        return alert_value == value
-    elif operator == "greater_than":
-        try:
-            return float(alert_value) > float(value)
-        except (ValueError, TypeError):
-            return False
-    elif operator == "less_than":
+    use_cache = os.environ.get("SOAR_RULES_CACHE", "1") == "1"
+    cache_path = path + ".cache.pkl"
+    cache_key = None
+    if use_cache:
+        stat = os.stat(path)
+        cache_key = (stat.st_mtime_ns, stat.st_size)
         try:
-            return float(alert_value) < float(value)
-        except (ValueError, TypeError):
-            return False
-    elif operator == "greater_than_or_equal":
-        try:
-            return float(alert_value) >= float(value)
-        except (ValueError, TypeError):
-            return False
-    elif operator == "less_than_or_equal":
+            with open(cache_path, "rb") as f:
+                cached_key, rules = pickle.load(f)
+            if cached_key == cache_key:
+                # Unpickled strings are not interned; redo it on cache hits.
+                rules = intern_keys(rules)
+                _install_contains_groups(rules)
+                for rule in rules:
+                    _compile_rule(rule)
+                return tuple(CompiledRule(rule) for rule in rules)
+        except (OSError, pickle.UnpicklingError, ValueError, EOFError):
+            pass
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_YamlLoader) or {}
+    rules = intern_keys(data.get("rules", []))
+    # Stable sort: lower priority value wins, equal priorities keep file
+    # order. Sorted before caching so cache hits skip the sort too.
+    rules.sort(key=lambda rule: rule.get("priority", 0))
+
+    if use_cache:
+        # Cache the raw parsed rules; compiled closures are not picklable,
+        # so compilation happens after every load.
         try:
-            return float(alert_value) <= float(value)
-        except (ValueError, TypeError):
-            return False
-    elif operator == "contains":
-        if isinstance(alert_value, str) and isinstance(value, str):
-            return value in alert_value
-        return False
-    elif operator == "not_equals":
-        return alert_value != value
-    else:
-        # Unknown operator, default to False
-        return False
+            with open(cache_path, "wb") as f:
+                pickle.dump((cache_key, rules), f, pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
 
-def match_rule(rule: Dict[str, Any], alert: Dict[str, Any]) -> bool:
+    _install_contains_groups(rules)
+    for rule in rules:
+        _compile_rule(rule)
+    return tuple(CompiledRule(rule) for rule in rules)
+
+def _compiled(rule: Any):
+    """Return the rule's ("all" | "any", [callables]) tuple, compiling on
+    demand for dict rules built in memory rather than via load_rules."""
+    if rule.__class__ is CompiledRule:
+        return rule.compiled
+    compiled = rule.get("_compiled")
+    if compiled is None and "conditions" in rule:
+        _compile_rule(rule)
+        compiled = rule.get("_compiled")
+    return compiled
+
+def match_rule(rule: Dict[str, Any], alert: Dict[str, Any], field_cache: Dict[Any, Any] = None) -> bool:
     """Check if a rule matches an alert based on conditions.
-    
+
     Args:
         rule: Rule dict with 'conditions' field
         alert: Alert data dict
-        
+        field_cache: Optional per-alert memo of extracted nested fields,
+            shared across rules when evaluating a whole ruleset
+
     Returns:
         bool: True if all conditions match
     """
-    conditions = rule.get("conditions", {})
-    
-    # Support conditions.all (all conditions must match)
-    if "all" in conditions:
-        all_conditions = conditions["all"]
-        if not isinstance(all_conditions, list):
-            return False
-        
-        for condition in all_conditions:
-            if not evaluate_condition(condition, alert):
-                return False
-        return True
-    
-    # Support conditions.any (at least one condition must match)
-    elif "any" in conditions:
-        any_conditions = conditions["any"]
-        if not isinstance(any_conditions, list):
-            return False
-        
-        for condition in any_conditions:
-            if evaluate_condition(condition, alert):
-                return True
+    compiled = _compiled(rule)
+    if compiled is None:
+        # No conditions defined, rule doesn't match
         return False
-    
-    # No conditions defined, rule doesn't match
-    return False
+
+    if field_cache is None:
+        field_cache = {}
+    group, conditions = compiled
+    if group == "all":
+        return all(condition(alert, field_cache) for condition in conditions)
+    return any(condition(alert, field_cache) for condition in conditions)
+
+# Equality predicates on these alert fields are used to index rules so that
+# evaluate() only fully checks a small candidate set instead of every rule.
+_INDEXED_FIELDS = ("type", "severity")
+
+def _build_index(rules: List[Dict[str, Any]]):
+    """Index rules by (field, value) equality predicates on indexed fields.
+
+    Returns (index, catch_all) where index maps (field, value) -> list of
+    (position, rule) and catch_all holds rules without an indexable
+    predicate. A rule is registered under at most one bucket: since every
+    condition in `all` must hold, one discriminating predicate suffices.
+    """
+    index: Dict[Any, List[Any]] = {}
+    catch_all = []
+    for position, rule in enumerate(rules):
+        key = None
+        spec = rule.spec if rule.__class__ is CompiledRule else rule
+        all_conditions = spec.get("conditions", {}).get("all")
+        if isinstance(all_conditions, list):
+            for condition in all_conditions:
+                if condition.get("operator") != "equals":
+                    continue
+                field = condition.get("field", "")
+                if field.startswith("alert."):
+                    field = field[len("alert."):]
+                if field in _INDEXED_FIELDS:
+                    key = (field, condition.get("value"))
+                    break
+        if key is not None:
+            index.setdefault(key, []).append((position, rule))
+        else:
+            # Rules with `any` conditions or no indexable equality predicate
+            # must always be checked.
+            catch_all.append((position, rule))
+    return index, catch_all
+
+_indexed_rules = None
+_rule_index: Dict[Any, List[Any]] = {}
+_catch_all: List[Any] = []
 
 def evaluate(rules: List[Dict[str, Any]], alert: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Evaluate rules against an alert.
-    
+
+    Only the candidate rules selected by the (field, value) index plus the
+    catch-all bucket are fully matched, so per-alert cost stays small as
+    the ruleset grows. The index is built once per rules list and reused
+    across calls.
+
     Args:
         rules: List of rule dicts
         alert: Alert data dict
-        
+
     Returns:
-        List of matched rules
+        List of matched rules (in original rule order)
     """
+    global _indexed_rules, _rule_index, _catch_all
+    if rules is not _indexed_rules:
+        _rule_index, _catch_all = _build_index(rules)
+        _indexed_rules = rules
+
+    candidates = list(_catch_all)
+    for field in _INDEXED_FIELDS:
+        candidates.extend(_rule_index.get((field, alert.get(field)), ()))
+    candidates.sort(key=lambda entry: entry[0])
+
     matched = []
-    for rule in rules:
-        if match_rule(rule, alert):
+    field_cache: Dict[Any, Any] = {}
+    for _, rule in candidates:
+        if match_rule(rule, alert, field_cache):
             matched.append(rule)
+            # First-match semantics: a matching rule flagged stop: true
+            # suppresses all lower-priority rules for this alert.
+            if rule.stop if rule.__class__ is CompiledRule else rule.get("stop", False):
+                break
+    return matched
+
+def evaluate_batch(rules: List[Dict[str, Any]], alerts: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Evaluate rules against a batch of alerts, rule-at-a-time.
+
+    Instead of re-dispatching every rule per alert, each compiled condition
+    is run across the whole batch and AND/OR-reduced through an int
+    bitmask, so non-matching alerts drop out before later conditions run.
+
+    Args:
+        rules: List of rule dicts
+        alerts: List of alert data dicts
+
+    Returns:
+        List of matched-rule lists, parallel to alerts
+    """
+    matched: List[List[Dict[str, Any]]] = [[] for _ in alerts]
+    if not alerts:
+        return matched
+    full_mask = (1 << len(alerts)) - 1
+    field_caches: List[Dict[Any, Any]] = [{} for _ in alerts]
+    # Alerts already claimed by a matching stop: true rule drop out of
+    # consideration for lower-priority rules.
+    active = full_mask
+
+    for rule in rules:
+        compiled = _compiled(rule)
+        if compiled is None:
+            continue
+        group, conditions = compiled
+        if group == "all":
+            mask = active
+            for condition in conditions:
+                passed = 0
+                remaining = mask
+                while remaining:
+                    low_bit = remaining & -remaining
+                    index = low_bit.bit_length() - 1
+                    if condition(alerts[index], field_caches[index]):
+                        passed |= low_bit
+                    remaining ^= low_bit
+                mask = passed
+                if not mask:
+                    break
+        else:
+            mask = 0
+            for condition in conditions:
+                remaining = active & ~mask
+                while remaining:
+                    low_bit = remaining & -remaining
+                    index = low_bit.bit_length() - 1
+                    if condition(alerts[index], field_caches[index]):
+                        mask |= low_bit
+                    remaining ^= low_bit
+                if mask == active:
+                    break
+
+        if mask and (rule.stop if rule.__class__ is CompiledRule else rule.get("stop", False)):
+            active &= ~mask
+        while mask:
+            low_bit = mask & -mask
+            matched[low_bit.bit_length() - 1].append(rule)
+            mask ^= low_bit
+        if not active:
+            break
     return matched
@@ -1,564 +1,421 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel
+from fastapi.responses import HTMLResponse, Response
+from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
+from collections import OrderedDict
+from functools import lru_cache
+from string import Template
+import asyncio
+import ast
+import gzip
+import hashlib
+import operator
+import shutil
+import subprocess
+import os
+import sys
 import yaml
 import json
 import re
 
-app = FastAPI(title="mini-SOAR Playbook Editor & Test")
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip still covers most clients.
+    brotli = None
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as JSONResponse
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def _json_loads(data: bytes):
+        return orjson.loads(data)
+except ImportError:
+    from fastapi.responses import JSONResponse
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def _json_loads(data: bytes):
+        return json.loads(data)
+
+app = FastAPI(title="mini-SOAR Playbook Editor & Test", default_response_class=JSONResponse)
+# Compress larger dynamic payloads (notably the YAML in /api/playbook).
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 ROOT = Path(__file__).resolve().parents[1]
 RULES_PATH = ROOT / "config" / "rules.yaml"
+# JSON sidecar of rules.yaml: rewritten on every save and preferred at
+# load time when at least as new as the YAML, since orjson parses it in a
+# fraction of a libyaml parse. Also served directly at /config/rules.json.
+RULES_JSON_PATH = ROOT / "config" / "rules.json"
 
-def load_playbook() -> Dict[str, Any]:
-    """Load playbook YAML file"""
+# Mock enrichment lives under backend/; resolve it once at import time instead
+# of per dry-run request (the old per-request sys.path.insert also grew
+# sys.path by one entry on every POST).
+_BACKEND_DIR = ROOT / "backend"
+if _BACKEND_DIR.exists() and str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Whether dry-runs should hit the real enrichment API; read once at startup.
+_USE_REAL_API = os.getenv("USE_REAL_ENRICHMENT_API", "false").lower() == "true"
+
+try:
+    from backend.mock_enrichment import vt_hash_result, vt_url_result, abuseipdb_result
+except ImportError:
+    # Constant fallbacks so dry-runs still work without the backend package.
+    def vt_hash_result(hashes):
+        return {"any_malicious": True, "max_score": 85, "total_lookups": 0}
+
+    def vt_url_result(urls):
+        return {"any_malicious": False, "max_score": 65, "urls_checked": 0}
+
+    def abuseipdb_result(ip):
+        return {"score": 90, "country": "US", "asn": "AS15169", "ip": ip}
+
+# (st_mtime_ns, st_size) -> parsed playbook + raw YAML text + serialized
+# /api/playbook JSON bytes, so repeated reads of an unchanged rules.yaml
+# skip the file read, the parse, and the response encoding. The JSON bytes
+# slot starts as None and is filled lazily by get_playbook.
+_playbook_cache = None
+
+def _load_playbook_cached():
+    """Return (parsed playbook, raw YAML text), cached by file mtime+size."""
+    global _playbook_cache
     if not RULES_PATH.exists():
-        return {"rules": []}
+        _playbook_cache = None
+        return {"rules": []}, ""
     try:
-        with open(RULES_PATH, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {"rules": []}
+        stat = RULES_PATH.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        cache = _playbook_cache
+        if cache is not None and cache[0] == key:
+            return cache[1], cache[2]
+        # One bytes read, one decode: the C loader takes the bytes directly
+        # and only the cached raw text pays for UTF-8 decoding.
+        raw_bytes = RULES_PATH.read_bytes()
+        # Prefer the JSON sidecar when it is at least as new as the YAML;
+        # the raw text is still read for the cache, but the expensive YAML
+        # parse is skipped.
+        data = None
+        if RULES_JSON_PATH.exists():
+            if RULES_JSON_PATH.stat().st_mtime_ns >= stat.st_mtime_ns:
+                try:
+                    data = _json_loads(RULES_JSON_PATH.read_bytes())
+                except ValueError:
+                    data = None
+        if data is None:
+            data = yaml.load(raw_bytes, Loader=_YamlLoader) or {"rules": []}
+        raw = raw_bytes.decode("utf-8")
+        _playbook_cache = (key, data, raw, None)
+        return data, raw
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load playbook: {str(e)}")
 
+def load_playbook() -> Dict[str, Any]:
+    """Load playbook YAML file"""
+    return _load_playbook_cached()[0]
+
 def save_playbook(yaml_content: str) -> Dict[str, Any]:
     """Save playbook YAML file"""
     try:
         # Validate YAML format
-        data = yaml.safe_load(yaml_content)
+        data = yaml.load(yaml_content, Loader=_YamlLoader)
         if data is None:
             data = {"rules": []}
         
+        # The verbatim fast path below is only safe when the submitted text
+        # already has the canonical {"rules": [...]} mapping shape; other
+        # accepted inputs (a bare list, a mapping without "rules") are
+        # normalized in memory and must be re-dumped, or readers of the
+        # file itself (src.rules.load_rules, the ingest API) would crash
+        # on a top-level list.
+        verbatim = isinstance(data, dict) and "rules" in data
+
         # Ensure rules key exists
         if "rules" not in data:
             data = {"rules": data if isinstance(data, list) else []}
-        
+
         # Ensure rules is a list
         if not isinstance(data["rules"], list):
             raise ValueError("'rules' must be a list")
-        
-        # Save to file
-        with open(RULES_PATH, "w", encoding="utf-8") as f:
-            yaml.dump(data, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
-        
+
+        # Write the user's YAML verbatim when possible — the parse above
+        # already proved it well-formed, and skipping the canonicalizing
+        # re-dump halves the YAML CPU per save and preserves comments and
+        # formatting. The write goes through a temp file + os.replace so
+        # readers never see a partial playbook, and identical content skips
+        # the rewrite entirely (keeps the mtime, and with it the
+        # _load_playbook_cached entry, intact).
+        if not verbatim:
+            yaml_content = yaml.dump(data, Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False)
+        encoded = yaml_content.encode("utf-8")
+        if not RULES_PATH.exists() or RULES_PATH.read_bytes() != encoded:
+            tmp_path = RULES_PATH.with_suffix(".yaml.tmp")
+            tmp_path.write_bytes(encoded)
+            os.replace(tmp_path, RULES_PATH)
+            # Prefill the cache from the parse we already did instead of
+            # just invalidating: the next GET /api/playbook becomes a pure
+            # hit with no file read or re-parse.
+            stat = RULES_PATH.stat()
+            global _playbook_cache
+            _playbook_cache = ((stat.st_mtime_ns, stat.st_size), data, yaml_content, None)
+            # Refresh the JSON sidecar so cold loads and /config/rules.json
+            # stay in step with the YAML just written.
+            tmp_json = RULES_JSON_PATH.with_suffix(".json.tmp")
+            tmp_json.write_bytes(_json_dumps(data))
+            os.replace(tmp_json, RULES_JSON_PATH)
+
         return {"message": "Playbook saved successfully", "rules_count": len(data.get("rules", []))}
     except yaml.YAMLError as e:
         raise HTTPException(status_code=400, detail=f"Invalid YAML format: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save playbook: {str(e)}")
 
+STATIC_DIR = ROOT / "static"
+VENDOR_DIR = STATIC_DIR / "vendor"
+
+class _ImmutableStaticFiles(StaticFiles):
+    """Static files with far-future caching; vendor assets are versioned."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+app.mount("/static", _ImmutableStaticFiles(directory=STATIC_DIR), name="static")
+
+# Production React is the default: the development bundles are 4-5x larger
+# and run assertion/warning machinery on every render. Set
+# MINI_SOAR_ENV=development to get the dev warnings back.
+_REACT_CHANNEL = (
+    "development" if os.getenv("MINI_SOAR_ENV", "").lower() == "development"
+    else "production.min"
+)
+
+# Third-party scripts used by the React pages: local mirror filename plus
+# the CDN fallback. Serving pinned copies from /static/vendor avoids three
+# third-party TLS handshakes per cold page load and makes browser caching
+# deterministic; run scripts/fetch_vendor_assets.py to populate the mirror.
+_VENDOR_SCRIPTS = {
+    "react": (f"react-18.{_REACT_CHANNEL}.js", f"https://unpkg.com/react@18/umd/react.{_REACT_CHANNEL}.js"),
+    "react-dom": (f"react-dom-18.{_REACT_CHANNEL}.js", f"https://unpkg.com/react-dom@18/umd/react-dom.{_REACT_CHANNEL}.js"),
+    "babel": ("babel-standalone.min.js", "https://unpkg.com/@babel/standalone/babel.min.js"),
+    "tailwind": ("tailwind.js", "https://cdn.tailwindcss.com"),
+}
+
+def _vendor_url(key: str) -> str:
+    """Local /static/vendor URL when the mirrored file exists, else the CDN."""
+    filename, cdn = _VENDOR_SCRIPTS[key]
+    if (VENDOR_DIR / filename).exists():
+        return f"/static/vendor/{filename}"
+    return cdn
+
+# The editor page is static (~16 KB); keep both the plain and the gzipped
+# bytes in memory so requests never touch the disk or re-compress.
+_EDITOR_HTML = (STATIC_DIR / "editor.html").read_bytes()
+_EDITOR_GZ = gzip.compress(_EDITOR_HTML, compresslevel=9)
+
+# Precompiled patterns for evaluate_expression_safe; compiling per call
+# would re-walk the re module's pattern cache on every request.
+_RE_WRAP = re.compile(r'^\$\{(.+)\}$')
+_RE_BARE_STEPS = re.compile(r'\bsteps\.\w+')
+_RE_HAS_WRAPPED_STEPS = re.compile(r'\$\{steps\.')
+_RE_BARE_SUB = re.compile(r'\bsteps\.([\w.]+)')
+_RE_VAR = re.compile(r'\$\{steps\.([\w.]+)\}')
+
+# Import-stripping patterns for the inlined JSX/TSX component sources.
+_RE_IMPORT_USESTATE = re.compile(r"import\s*\{\s*useState[^}]*\}\s*from\s*['\"]react['\"];?\s*\n?")
+_RE_IMPORT_ANY = re.compile(r"import\s*.*\s*from\s*['\"].*['\"];?\s*\n?")
+_RE_EXPORT_DEFAULT = re.compile(r"export default \w+;")
+# All of PlaybookPage's local imports plus its export, stripped in one scan
+# instead of five chained str.replace passes over the same source.
+_RE_PAGE_IMPORTS = re.compile(
+    r"^(?:import SplunkInputPanel from '\.\./components/SplunkInputPanel';"
+    r"|import LogConsole from '\.\./components/LogConsole';"
+    r"|import \{ normalizeSplunkAlert \} from '\.\./lib/normalize';"
+    r"|import \{ evaluateRules, loadRulesFromJson \} from '\.\./lib/rulesEngine';"
+    r"|export default PlaybookPage;)\n?",
+    re.MULTILINE,
+)
+_RE_LIB_EXPORTS = re.compile(
+    r"export \{ [^}]+ \};|if \(typeof module !== 'undefined' && module\.exports\) \{"
+)
+
+def _strip_lib_exports(source: str) -> str:
+    """Drop ES6 exports and disable the CommonJS guard in one pass."""
+    return _RE_LIB_EXPORTS.sub(
+        lambda m: 'if (false) {' if m.group(0).startswith('if') else '', source)
+
+# Sentinel distinguishing "key absent" from legitimate falsy step values.
+_MISSING = object()
+
+@lru_cache(maxsize=1024)
+def _split_path(path: str) -> tuple:
+    """Memoized split of a dotted variable path into its parts.
+
+    Expressions are re-evaluated with the same handful of paths over and
+    over (UI iteration, repeated dry-runs); caching the split avoids a
+    fresh list allocation per variable per call.
+    """
+    return tuple(path.split('.'))
+
+# Restricted expression compiler for evaluate_expression_safe: only boolean
+# combinations of comparisons over literals and ${steps.*} variables are
+# allowed. Compiling the AST into closures (cached per expression template)
+# replaces eval(), which would re-lex, re-parse and rebuild a code object
+# on every call.
+_ALLOWED_NAMES = {'True': True, 'False': False, 'true': True, 'false': False, 'None': None}
+_CMP_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+}
+
+def _compile_node(node, var_names):
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body, var_names)
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(value, var_names) for value in node.values]
+        if isinstance(node.op, ast.And):
+            return lambda env: all(part(env) for part in parts)
+        return lambda env: any(part(env) for part in parts)
+    if isinstance(node, ast.Compare):
+        left = _compile_node(node.left, var_names)
+        rights = [_compile_node(comparator, var_names) for comparator in node.comparators]
+        try:
+            ops = [_CMP_OPS[type(cmp_op)] for cmp_op in node.ops]
+        except KeyError as e:
+            raise ValueError(f'Unsupported comparison operator: {e}')
+        def run_compare(env):
+            current = left(env)
+            for cmp_op, right in zip(ops, rights):
+                other = right(env)
+                if not cmp_op(current, other):
+                    return False
+                current = other
+            return True
+        return run_compare
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return lambda env: value
+    if isinstance(node, ast.Name):
+        if node.id in _ALLOWED_NAMES:
+            value = _ALLOWED_NAMES[node.id]
+            return lambda env: value
+        if node.id in var_names:
+            name = node.id
+            return lambda env: env[name]
+        raise ValueError(f'Unsupported name: {node.id}')
+    if (isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub)
+            and isinstance(node.operand, ast.Constant)):
+        value = -node.operand.value
+        return lambda env: value
+    raise ValueError(f'Unsupported expression element: {type(node).__name__}')
+
+@lru_cache(maxsize=256)
+def _compile_template(expression: str):
+    """Compile an expression template once, keyed on its original text.
+
+    Does the full rewrite pipeline — outer ``${}`` unwrap, bare ``steps.``
+    normalization, ``&&``/``||`` translation — then replaces each distinct
+    ``${steps.*}`` variable with a placeholder name and compiles the result
+    to a closure over an environment dict. Returns ``(fn, variables)`` where
+    ``variables`` is a tuple of ``(placeholder, raw_text, path_parts)``.
+    Repeated dry-runs of the same template only pay for variable resolution.
+    """
+    evaluated = expression
+
+    # Step 1: Remove outer ${} wrapper if present. The startswith/endswith
+    # guard keeps the regex engine off expressions that obviously aren't
+    # wrapped; same for the "steps." substring check below.
+    if evaluated.startswith('${') and evaluated.endswith('}'):
+        wrapped_match = _RE_WRAP.match(evaluated)
+        if wrapped_match:
+            evaluated = wrapped_match.group(1)
+            # Check if inner expression has bare steps. references (without ${})
+            # If so, convert them to ${steps.xxx} format
+            if ('steps.' in evaluated and _RE_BARE_STEPS.search(evaluated)
+                    and not _RE_HAS_WRAPPED_STEPS.search(evaluated)):
+                evaluated = _RE_BARE_SUB.sub(r'${steps.\1}', evaluated)
+
+    # Step 2: Replace each distinct variable with a placeholder identifier.
+    names_by_path = {}
+    variables = []
+
+    def assign_name(match):
+        path = match.group(1)
+        name = names_by_path.get(path)
+        if name is None:
+            name = f'_v{len(names_by_path)}'
+            names_by_path[path] = name
+            variables.append((name, match.group(0), _split_path(path)))
+        return name
+
+    evaluated = _RE_VAR.sub(assign_name, evaluated)
+
+    # Step 3: Translate JS-style boolean operators for the Python parser.
+    evaluated = evaluated.replace('&&', ' and ')
+    evaluated = evaluated.replace('||', ' or ')
+
+    fn = _compile_node(ast.parse(evaluated, mode='eval'), frozenset(names_by_path.values()))
+    return fn, tuple(variables)
+
+# Enrich step prefix -> (enrich_config key, human-readable name) for the
+# "please enable X" hint when a referenced variable is missing.
+_ENRICH_STEP_NAMES = {
+    'vt_hash': ('vt_hash', 'VirusTotal Hash lookup'),
+    'vt_url': ('vt_url', 'VirusTotal URL reputation'),
+    'abuseipdb': ('abuseipdb_geoip', 'AbuseIPDB / GeoIP'),
+}
+
 @app.get("/", response_class=HTMLResponse)
-async def get_editor():
+async def get_editor(request: Request):
     """Return HTML editor interface"""
-    html_content = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>mini-SOAR Playbook Editor & Test</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
-            overflow: hidden;
-        }
-        
-        .header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }
-        
-        .header h1 {
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }
-        
-        .header p {
-            opacity: 0.9;
-            font-size: 1.1em;
-        }
-        
-        .tabs {
-            display: flex;
-            background: #f5f5f5;
-            border-bottom: 2px solid #e0e0e0;
-        }
-        
-        .tab {
-            flex: 1;
-            padding: 20px;
-            text-align: center;
-            cursor: pointer;
-            background: #f5f5f5;
-            border: none;
-            font-size: 1.1em;
-            font-weight: 600;
-            color: #666;
-            transition: all 0.3s;
-        }
-        
-        .tab:hover {
-            background: #e8e8e8;
-        }
-        
-        .tab.active {
-            background: white;
-            color: #667eea;
-            border-bottom: 3px solid #667eea;
-        }
-        
-        .content {
-            padding: 30px;
-        }
-        
-        .tab-content {
-            display: none;
-        }
-        
-        .tab-content.active {
-            display: block;
-        }
-        
-        .editor-section {
-            margin-bottom: 30px;
-        }
-        
-        .editor-section label {
-            display: block;
-            font-size: 1.1em;
-            font-weight: 600;
-            margin-bottom: 10px;
-            color: #333;
-        }
-        
-        textarea {
-            width: 100%;
-            min-height: 500px;
-            padding: 15px;
-            border: 2px solid #e0e0e0;
-            border-radius: 8px;
-            font-family: 'Courier New', monospace;
-            font-size: 14px;
-            resize: vertical;
-            transition: border-color 0.3s;
-        }
-        
-        textarea:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        
-        .button-group {
-            display: flex;
-            gap: 15px;
-            margin-top: 20px;
-        }
-        
-        button {
-            padding: 12px 30px;
-            border: none;
-            border-radius: 8px;
-            font-size: 1em;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s;
-        }
-        
-        .btn-primary {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-        }
-        
-        .btn-primary:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
-        }
-        
-        .btn-secondary {
-            background: #6c757d;
-            color: white;
-        }
-        
-        .btn-secondary:hover {
-            background: #5a6268;
-        }
-        
-        .btn-success {
-            background: #28a745;
-            color: white;
-        }
-        
-        .btn-success:hover {
-            background: #218838;
-        }
-        
-        .message {
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-            display: none;
-        }
-        
-        .message.success {
-            background: #d4edda;
-            color: #155724;
-            border: 1px solid #c3e6cb;
-        }
-        
-        .message.error {
-            background: #f8d7da;
-            color: #721c24;
-            border: 1px solid #f5c6cb;
-        }
-        
-        .viewer {
-            background: #f8f9fa;
-            border: 2px solid #e0e0e0;
-            border-radius: 8px;
-            padding: 20px;
-            max-height: 600px;
-            overflow-y: auto;
-        }
-        
-        .rule-card {
-            background: white;
-            border: 1px solid #e0e0e0;
-            border-radius: 8px;
-            padding: 20px;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        }
-        
-        .rule-name {
-            font-size: 1.5em;
-            font-weight: 700;
-            color: #667eea;
-            margin-bottom: 15px;
-        }
-        
-        .rule-section {
-            margin-bottom: 15px;
-        }
-        
-        .rule-section-title {
-            font-weight: 600;
-            color: #666;
-            margin-bottom: 8px;
-            font-size: 1.1em;
-        }
-        
-        .rule-section-content {
-            background: #f8f9fa;
-            padding: 12px;
-            border-radius: 6px;
-            font-family: 'Courier New', monospace;
-            white-space: pre-wrap;
-        }
-        
-        .stats {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .stat-card {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 8px;
-            text-align: center;
-        }
-        
-        .stat-value {
-            font-size: 2.5em;
-            font-weight: 700;
-            margin-bottom: 5px;
-        }
-        
-        .stat-label {
-            font-size: 1em;
-            opacity: 0.9;
-        }
-        
-        .yaml-viewer {
-            background: #282c34;
-            color: #abb2bf;
-            padding: 20px;
-            border-radius: 8px;
-            font-family: 'Courier New', monospace;
-            font-size: 14px;
-            white-space: pre-wrap;
-            overflow-x: auto;
-            max-height: 600px;
-            overflow-y: auto;
-        }
-        
-        .loading {
-            display: none;
-            text-align: center;
-            padding: 20px;
-        }
-        
-        .loading.active {
-            display: block;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🛡️ mini-SOAR Playbook Editor & Test</h1>
-            <p>Create and manage automated response rules</p>
-        </div>
-        
-        <div class="tabs">
-            <button class="tab" onclick="window.location.href='/builder'" style="background: linear-gradient(135deg, #ff6b6b 0%, #ee5a6f 100%); color: white;">Visual Playbook Builder</button>
-            <button class="tab" onclick="window.location.href='/splunk-lab'" style="background: linear-gradient(135deg, #28a745 0%, #20c997 100%); color: white;">Splunk Normalizer Lab</button>
-            <button class="tab active" onclick="switchTab('edit')">Edit Playbook</button>
-            <button class="tab" onclick="switchTab('view')">View Playbook</button>
-        </div>
-        
-        <div class="content">
-            <div id="message" class="message"></div>
-            
-            <!-- Edit Tab -->
-            <div id="edit-tab" class="tab-content active">
-                <div class="editor-section">
-                    <label for="yaml-editor">YAML Content:</label>
-                    <textarea id="yaml-editor" placeholder="Write your playbook YAML here..."></textarea>
-                </div>
-                <div class="button-group">
-                    <button class="btn-primary" onclick="loadPlaybook()">Load Current Playbook</button>
-                    <button class="btn-success" onclick="savePlaybook()">Save Playbook</button>
-                    <button class="btn-secondary" onclick="validateYAML()">Validate YAML</button>
-                </div>
-            </div>
-            
-            <!-- View Tab -->
-            <div id="view-tab" class="tab-content">
-                <div id="stats" class="stats"></div>
-                <div id="viewer-content"></div>
-                <div class="button-group">
-                    <button class="btn-primary" onclick="refreshView()">Refresh View</button>
-                </div>
-            </div>
-            
-            <div id="loading" class="loading active">Loading...</div>
-        </div>
-    </div>
-    
-    <script>
-        let currentYAML = '';
-        
-        function showMessage(text, type) {
-            const msg = document.getElementById('message');
-            msg.textContent = text;
-            msg.className = `message ${type}`;
-            msg.style.display = 'block';
-            setTimeout(() => {
-                msg.style.display = 'none';
-            }, 5000);
-        }
-        
-        function switchTab(tabName) {
-            // Update tab buttons
-            document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
-            event.target.classList.add('active');
-            
-            // Update content
-            document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
-            document.getElementById(tabName + '-tab').classList.add('active');
-            
-            if (tabName === 'view') {
-                loadView();
-            }
-        }
-        
-        async function loadPlaybook() {
-            try {
-                const response = await fetch('/api/playbook');
-                const data = await response.json();
-                document.getElementById('yaml-editor').value = data.yaml;
-                currentYAML = data.yaml;
-                showMessage('Playbook loaded successfully', 'success');
-            } catch (error) {
-                showMessage('Failed to load: ' + error.message, 'error');
-            }
-        }
-        
-        async function savePlaybook() {
-            const yamlContent = document.getElementById('yaml-editor').value;
-            
-            try {
-                const response = await fetch('/api/playbook', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ yaml: yamlContent })
-                });
-                
-                if (!response.ok) {
-                    const error = await response.json();
-                    throw new Error(error.detail || 'Failed to save');
-                }
-                
-                const data = await response.json();
-                currentYAML = yamlContent;
-                showMessage(`Saved successfully! Contains ${data.rules_count} rule(s)`, 'success');
-            } catch (error) {
-                showMessage('Failed to save: ' + error.message, 'error');
-            }
-        }
-        
-        function validateYAML() {
-            const yamlContent = document.getElementById('yaml-editor').value;
-            try {
-                const parsed = jsyaml.load(yamlContent);
-                if (!parsed || !parsed.rules || !Array.isArray(parsed.rules)) {
-                    throw new Error('YAML must contain a "rules" array');
-                }
-                showMessage('YAML format is valid!', 'success');
-            } catch (error) {
-                showMessage('YAML format error: ' + error.message, 'error');
-            }
-        }
-        
-        async function loadView() {
-            const loading = document.getElementById('loading');
-            const viewerContent = document.getElementById('viewer-content');
-            loading.classList.add('active');
-            viewerContent.innerHTML = '';
-            
-            try {
-                const response = await fetch('/api/playbook');
-                const data = await response.json();
-                
-                // Update statistics
-                const statsDiv = document.getElementById('stats');
-                statsDiv.innerHTML = `
-                    <div class="stat-card">
-                        <div class="stat-value">${data.json.rules.length}</div>
-                        <div class="stat-label">Total Rules</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">${data.json.rules.filter(r => r.conditions).length}</div>
-                        <div class="stat-label">Conditional Rules</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">${data.json.rules.filter(r => r.actions && r.actions.length > 0).length}</div>
-                        <div class="stat-label">Action Rules</div>
-                    </div>
-                `;
-                
-                // Display rules
-                if (data.json.rules.length === 0) {
-                    viewerContent.innerHTML = '<p style="text-align: center; padding: 40px; color: #666;">No rules found</p>';
-                } else {
-                    viewerContent.innerHTML = '<div style="margin-bottom: 20px;"><h3 style="margin-bottom: 10px;">Rules List:</h3></div>';
-                    data.json.rules.forEach((rule, index) => {
-                        const ruleCard = document.createElement('div');
-                        ruleCard.className = 'rule-card';
-                        
-                        let conditionsContent = 'None';
-                        if (rule.conditions) {
-                            conditionsContent = JSON.stringify(rule.conditions, null, 2);
-                        }
-                        
-                        let actionsContent = 'None';
-                        if (rule.actions && rule.actions.length > 0) {
-                            actionsContent = JSON.stringify(rule.actions, null, 2);
-                        }
-                        
-                        let mitreContent = 'None';
-                        if (rule.mitre && rule.mitre.length > 0) {
-                            mitreContent = rule.mitre.join(', ');
-                        }
-                        
-                        ruleCard.innerHTML = `
-                            <div class="rule-name">Rule ${index + 1}: ${rule.name || 'Unnamed'}</div>
-                            <div class="rule-section">
-                                <div class="rule-section-title">Conditions:</div>
-                                <div class="rule-section-content">${conditionsContent}</div>
-                            </div>
-                            <div class="rule-section">
-                                <div class="rule-section-title">Actions:</div>
-                                <div class="rule-section-content">${actionsContent}</div>
-                            </div>
-                            ${mitreContent !== 'None' ? `
-                            <div class="rule-section">
-                                <div class="rule-section-title">MITRE ATT&CK:</div>
-                                <div class="rule-section-content">${mitreContent}</div>
-                            </div>
-                            ` : ''}
-                        `;
-                        viewerContent.appendChild(ruleCard);
-                    });
-                }
-                
-                // Add raw YAML content viewer
-                const yamlViewer = document.createElement('div');
-                yamlViewer.style.marginTop = '30px';
-                yamlViewer.innerHTML = `
-                    <h3 style="margin-bottom: 10px;">Raw YAML:</h3>
-                    <div class="yaml-viewer">${escapeHtml(data.yaml)}</div>
-                `;
-                viewerContent.appendChild(yamlViewer);
-                
-            } catch (error) {
-                viewerContent.innerHTML = '<p style="color: red;">Failed to load: ' + error.message + '</p>';
-            } finally {
-                loading.classList.remove('active');
-            }
-        }
-        
-        function refreshView() {
-            loadView();
-        }
-        
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
-        
-        // Load playbook on page load
-        window.onload = function() {
-            loadPlaybook();
-        };
-    </script>
-    <script src="https://cdn.jsdelivr.net/npm/js-yaml@4.1.0/dist/js-yaml.min.js"></script>
-</body>
-</html>
-    """
-    return HTMLResponse(content=html_content)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        content, encoding = _EDITOR_GZ, "gzip"
+    else:
+        content, encoding = _EDITOR_HTML, "identity"
+    return Response(
+        content=content,
+        media_type="text/html",
+        headers={
+            "Cache-Control": "public, max-age=3600",
+            "Content-Encoding": encoding,
+            "Vary": "Accept-Encoding",
+        },
+    )
 
 @app.get("/api/playbook")
 async def get_playbook():
     """Get playbook (YAML and JSON format)"""
+    global _playbook_cache
     try:
-        playbook = load_playbook()
-        
+        # Warm path: a single stat on the loop confirms the cached payload
+        # is current and the prebuilt bytes go straight out.
+        cached = _playbook_cache
+        if cached is not None and cached[3] is not None and RULES_PATH.exists():
+            stat = RULES_PATH.stat()
+            if (stat.st_mtime_ns, stat.st_size) == cached[0]:
+                return Response(content=cached[3], media_type="application/json")
+
+        # Cold or changed: the file read and YAML parse block, so run them
+        # off the event loop the same way the page builders do.
+        playbook, yaml_content = await asyncio.to_thread(_load_playbook_cached)
+
         # Ensure playbook has rules field
         if not isinstance(playbook, dict):
             playbook = {"rules": []}
@@ -566,40 +423,105 @@ async def get_playbook():
             playbook["rules"] = []
         if not isinstance(playbook["rules"], list):
             playbook["rules"] = []
-        
-        # Read raw YAML content
-        yaml_content = ""
-        if RULES_PATH.exists():
-            with open(RULES_PATH, "r", encoding="utf-8") as f:
-                yaml_content = f.read()
-        else:
-            yaml_content = yaml.dump(playbook, allow_unicode=True, default_flow_style=False)
-        
-        return JSONResponse(content={
-            "yaml": yaml_content,
-            "json": playbook
-        })
+
+        if not yaml_content:
+            yaml_content = yaml.dump(playbook, Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False)
+
+        body = _json_dumps({"yaml": yaml_content, "json": playbook})
+        # Only attach the body to the cache entry it was built from: a save
+        # landing while this ran in the worker thread would have installed
+        # a newer entry, and pinning these bytes under the new key would
+        # serve the old playbook until the file changed again.
+        cached = _playbook_cache
+        if cached is not None and cached[1] is playbook:
+            _playbook_cache = (cached[0], cached[1], cached[2], body)
+        return Response(content=body, media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class SavePlaybookBody(BaseModel):
+    yaml: str
+
 @app.post("/api/playbook")
-async def save_playbook_api(request: Dict[str, Any]):
+async def save_playbook_api(body: SavePlaybookBody):
     """Save playbook"""
-    yaml_content = request.get("yaml", "")
-    if not yaml_content:
+    if not body.yaml:
         raise HTTPException(status_code=400, detail="YAML content is required")
-    
-    # Call synchronous save_playbook function and return result
-    result = save_playbook(yaml_content)
+
+    # save_playbook validates, reads and atomically rewrites the file —
+    # all blocking — so it runs in a worker thread; HTTPExceptions raised
+    # there propagate unchanged.
+    result = await asyncio.to_thread(save_playbook, body.yaml)
     return JSONResponse(content=result)
 
+class RuleBatch(BaseModel):
+    upserts: List[Dict[str, Any]] = []
+    deletes: List[str] = []
+
+@app.patch("/api/playbook/rules")
+async def patch_playbook_rules(batch: RuleBatch):
+    """Apply a batch of rule upserts/deletes in one parse+write cycle.
+
+    Saving through POST /api/playbook costs a full-file round-trip per
+    edit; autosaving editors and bulk importers can send N edits here and
+    pay for one parse, one dump and one atomic write instead of N.
+    Upserts match existing rules by name, deletes are a list of names.
+    """
+    if not batch.upserts and not batch.deletes:
+        raise HTTPException(status_code=400, detail="No rule operations provided")
+
+    def _apply() -> Dict[str, Any]:
+        data, _ = _load_playbook_cached()
+        rules = list(data.get("rules") or []) if isinstance(data, dict) else []
+        by_name = {r.get("name"): i for i, r in enumerate(rules) if isinstance(r, dict)}
+        for rule in batch.upserts:
+            name = rule.get("name")
+            if not name:
+                raise HTTPException(status_code=400, detail="Each rule upsert requires a 'name'")
+            index = by_name.get(name)
+            if index is None:
+                by_name[name] = len(rules)
+                rules.append(rule)
+            else:
+                rules[index] = rule
+        if batch.deletes:
+            dropped = set(batch.deletes)
+            rules = [r for r in rules if not (isinstance(r, dict) and r.get("name") in dropped)]
+        text = yaml.dump(
+            {"rules": rules}, Dumper=_YamlDumper,
+            allow_unicode=True, default_flow_style=False, sort_keys=False,
+        )
+        # save_playbook gives the atomic write, cache prefill and JSON
+        # sidecar refresh for free.
+        return save_playbook(text)
+
+    result = await asyncio.to_thread(_apply)
+    return JSONResponse(content=result)
+
+# (st_mtime_ns, st_size) -> (bytes, etag) for /config/rules.json, a small
+# static config fetched on every page load.
+_rules_json_cache = None
+
 @app.get("/config/rules.json")
-async def get_rules_json():
+async def get_rules_json(request: Request):
     """Get rules.json file"""
-    rules_json_path = ROOT / "config" / "rules.json"
-    if not rules_json_path.exists():
+    global _rules_json_cache
+    if not RULES_JSON_PATH.exists():
         raise HTTPException(status_code=404, detail="rules.json not found")
-    return FileResponse(str(rules_json_path))
+    stat = RULES_JSON_PATH.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    cache = _rules_json_cache
+    if cache is None or cache[0] != key:
+        body = RULES_JSON_PATH.read_bytes()
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        cache = _rules_json_cache = (key, body, etag)
+    _, body, etag = cache
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 def evaluate_expression_safe(expression: str, steps: Dict[str, Any], enrich_config: Dict[str, Any] = None) -> bool:
     """
@@ -618,118 +540,121 @@ def evaluate_expression_safe(expression: str, steps: Dict[str, Any], enrich_conf
         ValueError: If expression evaluation fails or variables are missing
     """
     try:
-        import re
         if not expression or not isinstance(expression, str):
             raise ValueError('Expression must be a non-empty string')
-        
-        evaluated = expression.strip()
+
         enrich_config = enrich_config or {}
-        
-        # Step 1: Remove outer ${} wrapper if present
-        wrapped_match = re.match(r'^\$\{(.+)\}$', evaluated)
-        if wrapped_match:
-            evaluated = wrapped_match.group(1)
-            # Check if inner expression has bare steps. references (without ${})
-            # If so, convert them to ${steps.xxx} format
-            if re.search(r'\bsteps\.\w+', evaluated) and not re.search(r'\$\{steps\.', evaluated):
-                evaluated = re.sub(r'\bsteps\.([\w.]+)', r'${steps.\1}', evaluated)
-        
-        # Step 2: Replace ${steps.xxx} with actual values
-        variable_pattern = r'\$\{steps\.([\w.]+)\}'
+
+        # The rewrite + parse + compile pipeline is cached per template, so
+        # repeated calls only resolve variables and run the closure.
+        fn, variables = _compile_template(expression.strip())
+
+        env = {}
         missing_vars = []
         missing_enrich_steps = []
-        
-        def replace_var(match):
-            path = match.group(1)
-            parts = path.split('.')
+        for name, raw, parts in variables:
             value = steps
-            
-            # Navigate through the path
             for part in parts:
-                if value and isinstance(value, dict) and part in value:
-                    value = value[part]
+                # Exact-type check plus .get with a sentinel: one dict
+                # lookup per hop, no membership test or MRO walk.
+                if value.__class__ is dict:
+                    value = value.get(part, _MISSING)
                 else:
-                    # Variable not found
-                    missing_vars.append(match.group(0))
-                    
-                    # Check if this is because the enrich step is not enabled
-                    enrich_step = parts[0]  # e.g., 'vt_hash', 'vt_url', 'abuseipdb'
-                    if enrich_step == 'vt_hash' and not enrich_config.get('vt_hash', False):
-                        missing_enrich_steps.append('VirusTotal Hash lookup')
-                    elif enrich_step == 'vt_url' and not enrich_config.get('vt_url', False):
-                        missing_enrich_steps.append('VirusTotal URL reputation')
-                    elif enrich_step == 'abuseipdb' and not enrich_config.get('abuseipdb_geoip', False):
-                        missing_enrich_steps.append('AbuseIPDB / GeoIP')
-                    
-                    return match.group(0)  # Return original if not found
-            
-            # Convert to appropriate type for comparison
-            if isinstance(value, bool):
-                return 'True' if value else 'False'
-            elif isinstance(value, (int, float)):
-                return str(value)
-            elif value is None:
-                return 'None'
+                    value = _MISSING
+                if value is _MISSING:
+                    # Variable not found; note whether the enrich step that
+                    # would provide it is simply not enabled.
+                    missing_vars.append(raw)
+                    step = _ENRICH_STEP_NAMES.get(parts[0])
+                    if step is not None and not enrich_config.get(step[0], False):
+                        missing_enrich_steps.append(step[1])
+                    break
             else:
-                return f'"{value}"'
-        
-        evaluated = re.sub(variable_pattern, replace_var, evaluated)
-        
-        # Step 3: Check for unresolved variables
-        remaining_vars = re.findall(r'\$\{steps\.[\w.]+\}', evaluated)
-        if remaining_vars:
+                env[name] = value
+
+        if missing_vars:
             enrich_msg = ''
             if missing_enrich_steps:
                 enrich_msg = f'\n\nPlease enable the following enrich steps: {", ".join(missing_enrich_steps)}'
             raise ValueError(
-                f'Unresolved variables found: {", ".join(remaining_vars)}. '
+                f'Unresolved variables found: {", ".join(missing_vars)}. '
                 f'These variables may not be available in the test data.{enrich_msg}'
             )
-        
-        # Simple parser: only allow safe operations
-        # Replace && with and, || with or for Python evaluation
-        evaluated = evaluated.replace('&&', ' and ')
-        evaluated = evaluated.replace('||', ' or ')
-        evaluated = evaluated.replace('==', '==')
-        evaluated = evaluated.replace('>=', '>=')
-        evaluated = evaluated.replace('<=', '<=')
-        evaluated = evaluated.replace('>', '>')
-        evaluated = evaluated.replace('<', '<')
-        evaluated = evaluated.replace('!=', '!=')
-        
-        # Evaluate in restricted context
-        # Only allow comparison operations
-        allowed_names = {
-            'True': True,
-            'False': False,
-            'true': True,
-            'false': False,
-        }
-        
-        # Use eval with restricted globals and locals
-        result = eval(evaluated, {"__builtins__": {}}, allowed_names)
-        return bool(result)
+
+        return bool(fn(env))
     except Exception as e:
         raise ValueError(f"Expression evaluation failed: {str(e)}")
 
+# One formatter per enrich step: each builds its log line in a single
+# f-string from a local result dict, replacing the old per-branch ladder
+# with its repeated mock_steps[...] lookups.
+_STEP_LOG_FORMATS = {
+    "vt_hash": lambda r: (
+        f"vt_hash: VirusTotal hash lookup - any_malicious: {r['any_malicious']}, "
+        f"max_score: {r['max_score']}, total_lookups: {r['total_lookups']}"
+    ),
+    "vt_url": lambda r: (
+        f"vt_url: VirusTotal URL reputation - any_malicious: {r['any_malicious']}, "
+        f"max_score: {r['max_score']}, urls_checked: {r['urls_checked']}"
+    ),
+    "abuseipdb": lambda r: (
+        f"abuseipdb: AbuseIPDB GeoIP lookup - score: {r['score']}, "
+        f"country: {r['country']}, asn: {r['asn']}, ip: {r['ip']}"
+    ),
+}
+
+async def _run_vt_hash(collect: Dict[str, Any], use_real_api: bool):
+    """VirusTotal hash lookup, one call for the whole hash batch."""
+    hashes = collect.get("attachment_hashes", "").split(",") if collect.get("attachment_hashes") else []
+    if use_real_api:
+        # TODO: Replace with real API call
+        # from backend.real_enrichment import vt_hash_lookup
+        # return await vt_hash_lookup(hashes)
+        return None
+    return vt_hash_result(hashes)
+
+async def _run_vt_url(collect: Dict[str, Any], use_real_api: bool):
+    """VirusTotal URL reputation, one call for the whole URL batch."""
+    urls = collect.get("urls", "").split(",") if collect.get("urls") else []
+    if use_real_api:
+        # TODO: Replace with real API call
+        # from backend.real_enrichment import vt_url_lookup
+        # return await vt_url_lookup(urls)
+        return None
+    return vt_url_result(urls)
+
+async def _run_abuseipdb(collect: Dict[str, Any], use_real_api: bool):
+    """AbuseIPDB / GeoIP lookup for the collected source IP(s)."""
+    ip = collect.get("src_ip", "0.0.0.0")
+    if use_real_api:
+        from backend.real_enrichment import abuseipdb_batch
+        # A playbook may collect several comma-separated IPs; dedupe and
+        # send them as one concurrent batch instead of serial round-trips.
+        ips = [p.strip() for p in ip.split(",") if p.strip()] or ["0.0.0.0"]
+        results = await abuseipdb_batch(ips)
+        if not results:
+            return None
+        # The condition expression sees a single abuseipdb step; surface
+        # the worst-scoring IP so the high branch can't be masked.
+        return max(results.values(), key=lambda r: r["score"])
+    return abuseipdb_result(ip)
+
+# Enrich-config flag -> (mock_steps key, runner). The dry-run handler
+# iterates only the flags that are actually enabled; adding an enricher
+# means one entry here plus a formatter in _STEP_LOG_FORMATS.
+_ENRICHERS = {
+    "vt_hash": ("vt_hash", _run_vt_hash),
+    "vt_url": ("vt_url", _run_vt_url),
+    "abuseipdb_geoip": ("abuseipdb", _run_abuseipdb),
+}
+
 @app.post("/api/playbooks/dryrun")
 async def dryrun_playbook(request: Dict[str, Any]):
     """
     Dry-run endpoint for testing playbooks.
     Uses mock enrichment functions or real API based on environment.
     """
-    import os
-    import sys
-    from pathlib import Path
-    
-    # Add backend directory to path if it exists
-    backend_dir = Path(__file__).resolve().parents[1] / "backend"
-    if backend_dir.exists():
-        sys.path.insert(0, str(backend_dir.parent))
-    
-    # Check if we should use real API (controlled by environment variable)
-    use_real_api = os.getenv("USE_REAL_ENRICHMENT_API", "false").lower() == "true"
-    
+    # Whether to hit the real API is a module-level constant (_USE_REAL_API).
     config = request.get("config", {})
     enrich = config.get("enrich", {})
     collect = config.get("collect", {})
@@ -745,123 +670,41 @@ async def dryrun_playbook(request: Dict[str, Any]):
     # If testing expression directly, check which variables are referenced and generate mock data for them
     expression = condition.get("expression", "")
     if expression:
-        import re
-        variable_pattern = r'\$\{steps\.([\w.]+)\}'
         referenced_vars = set()
-        for match in re.finditer(variable_pattern, expression):
-            var_path = match.group(1)
-            parts = var_path.split('.')
+        for match in _RE_VAR.finditer(expression):
+            parts = _split_path(match.group(1))
             if len(parts) > 0:
                 referenced_vars.add(parts[0])  # e.g., 'vt_hash', 'vt_url', 'abuseipdb'
         
         # Auto-enable enrich steps that are referenced in the expression
-        if 'vt_hash' in referenced_vars and not enrich.get("vt_hash", False):
-            enrich["vt_hash"] = True
-        if 'vt_url' in referenced_vars and not enrich.get("vt_url", False):
-            enrich["vt_url"] = True
-        if 'abuseipdb' in referenced_vars and not enrich.get("abuseipdb_geoip", False):
-            enrich["abuseipdb_geoip"] = True
+        for prefix, (config_key, _) in _ENRICH_STEP_NAMES.items():
+            if prefix in referenced_vars and not enrich.get(config_key, False):
+                enrich[config_key] = True
     
-    # Generate enrich results based on flags
+    # Generate enrich results based on flags. The steps are independent, so
+    # run them concurrently; against a real API this costs max(latency)
+    # instead of the sum, and each helper sends its whole batch in one call.
     step_num = 2
+
+    enrich_tasks = [
+        (step_key, runner(collect, _USE_REAL_API))
+        for flag, (step_key, runner) in _ENRICHERS.items()
+        if enrich.get(flag)
+    ]
+
+    if enrich_tasks:
+        results = await asyncio.gather(*(coro for _, coro in enrich_tasks))
+        for (step_key, _), result in zip(enrich_tasks, results):
+            if result is None:
+                continue
+            mock_steps[step_key] = result
+            execution_log.append(f"[{step_num}] {_STEP_LOG_FORMATS[step_key](result)}")
+            step_num += 1
     
-    if enrich.get("vt_hash", False):
-        if use_real_api:
-            # TODO: Replace with real API call
-            # from backend.real_enrichment import vt_hash_lookup
-            # hashes = collect.get("attachment_hashes", "").split(",") if collect.get("attachment_hashes") else []
-            # mock_steps["vt_hash"] = vt_hash_lookup(hashes)
-            pass
-        else:
-            # Use mock function
-            try:
-                from backend.mock_enrichment import vt_hash_result
-                hashes = collect.get("attachment_hashes", "").split(",") if collect.get("attachment_hashes") else []
-                mock_steps["vt_hash"] = vt_hash_result(hashes)
-                execution_log.append(
-                    f"[{step_num}] vt_hash: VirusTotal hash lookup - "
-                    f"any_malicious: {mock_steps['vt_hash']['any_malicious']}, "
-                    f"max_score: {mock_steps['vt_hash']['max_score']}, "
-                    f"total_lookups: {mock_steps['vt_hash']['total_lookups']}"
-                )
-                step_num += 1
-            except ImportError:
-                # Fallback if import fails
-                mock_steps["vt_hash"] = {
-                    "any_malicious": True,
-                    "max_score": 85,
-                    "total_lookups": 0
-                }
-                execution_log.append(f"[{step_num}] vt_hash: VirusTotal hash lookup (fallback)")
-                step_num += 1
-    
-    if enrich.get("vt_url", False):
-        if use_real_api:
-            # TODO: Replace with real API call
-            # from backend.real_enrichment import vt_url_lookup
-            # urls = collect.get("urls", "").split(",") if collect.get("urls") else []
-            # mock_steps["vt_url"] = vt_url_lookup(urls)
-            pass
-        else:
-            # Use mock function
-            try:
-                from backend.mock_enrichment import vt_url_result
-                urls = collect.get("urls", "").split(",") if collect.get("urls") else []
-                mock_steps["vt_url"] = vt_url_result(urls)
-                execution_log.append(
-                    f"[{step_num}] vt_url: VirusTotal URL reputation - "
-                    f"any_malicious: {mock_steps['vt_url']['any_malicious']}, "
-                    f"max_score: {mock_steps['vt_url']['max_score']}, "
-                    f"urls_checked: {mock_steps['vt_url']['urls_checked']}"
-                )
-                step_num += 1
-            except ImportError:
-                # Fallback if import fails
-                mock_steps["vt_url"] = {
-                    "any_malicious": False,
-                    "max_score": 65,
-                    "urls_checked": 0
-                }
-                execution_log.append(f"[{step_num}] vt_url: VirusTotal URL reputation (fallback)")
-                step_num += 1
-    
-    if enrich.get("abuseipdb_geoip", False):
-        if use_real_api:
-            # TODO: Replace with real API call
-            # from backend.real_enrichment import abuseipdb_lookup
-            # ip = collect.get("src_ip", "")
-            # mock_steps["abuseipdb"] = abuseipdb_lookup(ip)
-            pass
-        else:
-            # Use mock function
-            try:
-                from backend.mock_enrichment import abuseipdb_result
-                ip = collect.get("src_ip", "0.0.0.0")
-                mock_steps["abuseipdb"] = abuseipdb_result(ip)
-                execution_log.append(
-                    f"[{step_num}] abuseipdb: AbuseIPDB GeoIP lookup - "
-                    f"score: {mock_steps['abuseipdb']['score']}, "
-                    f"country: {mock_steps['abuseipdb']['country']}, "
-                    f"asn: {mock_steps['abuseipdb']['asn']}, "
-                    f"ip: {mock_steps['abuseipdb']['ip']}"
-                )
-                step_num += 1
-            except ImportError:
-                # Fallback if import fails
-                mock_steps["abuseipdb"] = {
-                    "score": 90,
-                    "country": "US",
-                    "asn": "AS15169",
-                    "ip": collect.get("src_ip", "0.0.0.0")
-                }
-                execution_log.append(f"[{step_num}] abuseipdb: AbuseIPDB GeoIP lookup (fallback)")
-                step_num += 1
-    
-    # Step: evaluate condition
+    # Step: evaluate condition (expression was already fetched above)
     condition_result = False
     branch_taken = "low"
-    expression = condition.get("expression", "")
-    
+
     if expression:
         try:
             condition_result = evaluate_expression_safe(expression, mock_steps, enrich)
@@ -876,15 +719,23 @@ async def dryrun_playbook(request: Dict[str, Any]):
             execution_log.append(f"[{step_num}] evaluate: Condition evaluation failed - {str(e)}")
             step_num += 1
     
-    # Step: action_group execution
-    branch_actions = actions.get("trueActions", []) if condition_result else actions.get("falseActions", [])
+    # Step: action_group execution. Explicit if/else so only the taken
+    # branch's key is looked up, and `or ()` shares one empty constant
+    # instead of allocating a fallback list per request.
+    if condition_result:
+        branch_actions = actions.get("trueActions") or ()
+    else:
+        branch_actions = actions.get("falseActions") or ()
     if branch_actions:
-        execution_log.append(f"[{step_num}] {branch_taken}: Executing {len(branch_actions)} action(s)")
+        # Pre-bound append and a generator feeding str.join: no method
+        # lookup per iteration and no intermediate list per action.
+        log_action = execution_log.append
+        log_action(f"[{step_num}] {branch_taken}: Executing {len(branch_actions)} action(s)")
         for action in branch_actions:
             action_name = action.get("action", "unknown")
             action_params = action.get("input", {})
-            params_str = ", ".join([f"{k}: {v}" for k, v in action_params.items()])
-            execution_log.append(f"  - {action_name} ({params_str})")
+            params_str = ", ".join(f"{k}: {v}" for k, v in action_params.items())
+            log_action(f"  - {action_name} ({params_str})")
     
     return JSONResponse(content={
         "steps": mock_steps,
@@ -895,8 +746,17 @@ async def dryrun_playbook(request: Dict[str, Any]):
     })
 
 # In-memory storage for playbooks (in production, use database)
-_playbook_storage = {}
+# Builder playbooks live in process memory; bound the dict so repeated
+# saves can't grow RSS without limit. Oldest entries are evicted first.
+_MAX_STORED_PLAYBOOKS = 100
+_playbook_storage: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 _current_playbook_id = None
+# Serializes the insert + eviction + current-id update so concurrent saves
+# can't interleave. Reads stay lock-free: single-key dict access is atomic
+# under the GIL, so get_current_playbook needs no defensive copies. This
+# storage is per-process; multiple uvicorn workers would each have their
+# own (a real database is the answer there, per the comment above).
+_playbook_lock = asyncio.Lock()
 
 @app.post("/api/playbooks")
 async def save_playbook_to_storage(request: Dict[str, Any]):
@@ -914,10 +774,15 @@ async def save_playbook_to_storage(request: Dict[str, Any]):
     playbook_id = playbook.get("id") or str(uuid.uuid4())
     playbook["id"] = playbook_id
     
-    # Save to storage
-    _playbook_storage[playbook_id] = playbook
+    # Save to storage, refreshing recency and evicting the oldest entry
+    # once the bound is hit.
     global _current_playbook_id
-    _current_playbook_id = playbook_id
+    async with _playbook_lock:
+        _playbook_storage[playbook_id] = playbook
+        _playbook_storage.move_to_end(playbook_id)
+        if len(_playbook_storage) > _MAX_STORED_PLAYBOOKS:
+            _playbook_storage.popitem(last=False)
+        _current_playbook_id = playbook_id
     
     return JSONResponse(content={
         "id": playbook_id,
@@ -931,19 +796,80 @@ async def get_current_playbook():
     Returns 404 if no playbook is saved.
     """
     global _current_playbook_id
-    
-    if _current_playbook_id is None or _current_playbook_id not in _playbook_storage:
+
+    playbook = _playbook_storage.get(_current_playbook_id) if _current_playbook_id else None
+    if playbook is None:
         raise HTTPException(status_code=404, detail="No playbook found")
-    
-    playbook = _playbook_storage[_current_playbook_id]
     return JSONResponse(content={
         "playbook": playbook,
         "id": _current_playbook_id
     })
 
-@app.get("/splunk-lab", response_class=HTMLResponse)
-async def get_splunk_lab():
-    """Return Splunk Normalizer Lab React page"""
+# Transpile JSX on the server when an esbuild binary is around, so browsers
+# get plain JS instead of downloading ~3 MB of @babel/standalone and
+# compiling the components on every page view. Without esbuild the pages
+# keep their in-browser Babel setup.
+_ESBUILD = shutil.which("esbuild")
+
+# Matches the Babel script tag whether it points at the CDN or the local
+# vendor mirror, so server-side transpilation can drop it either way.
+_RE_BABEL_TAG = re.compile(r'[ \t]*<script src="[^"]*babel[^"]*"></script>\n?')
+
+def _inline_babel_to_js(html: str) -> str:
+    """Transpile the page's inline text/babel script server-side if possible."""
+    if _ESBUILD is None:
+        return html
+    open_tag = '<script type="text/babel">'
+    start = html.find(open_tag)
+    if start == -1:
+        return html
+    end = html.find('</script>', start)
+    source = html[start + len(open_tag):end]
+    try:
+        proc = subprocess.run(
+            [_ESBUILD, "--loader=jsx"],
+            input=source.encode("utf-8"),
+            capture_output=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return html
+    compiled = proc.stdout.decode("utf-8")
+    html = html[:start] + '<script>' + compiled + '</script>' + html[end + len('</script>'):]
+    return _RE_BABEL_TAG.sub('', html)
+
+# console.log arguments in the templates nest at most two call levels
+# (e.g. Object.keys(...).filter(k => k.includes(...))); match balanced
+# parens to that depth so a whole statement goes in one sub.
+_RE_CONSOLE_LOG = re.compile(
+    r"[ \t]*console\.log\((?:[^()]|\((?:[^()]|\([^()]*\))*\))*\);?\n?"
+)
+
+def _strip_debug_logs(html: str) -> str:
+    """Drop console.log tracing from production pages.
+
+    Each call makes the browser format its arguments on every page load
+    even with devtools closed, and the statements add ~1 KB of payload.
+    MINI_SOAR_ENV=development keeps them, matching the React dev builds.
+    """
+    if _REACT_CHANNEL == "development":
+        return html
+    return _RE_CONSOLE_LOG.sub("", html)
+
+_TEMPLATES_DIR = ROOT / "templates"
+
+@lru_cache(maxsize=4)
+def _page_template(name: str) -> Template:
+    """Load a page template from templates/ once per process.
+
+    The markup lives in plain files with $placeholders, so CSS and JS
+    braces stay literal instead of being doubled inside a giant f-string.
+    """
+    return Template((_TEMPLATES_DIR / name).read_text(encoding="utf-8"))
+
+@lru_cache(maxsize=1)
+def _build_splunk_lab_html() -> bytes:
+    """Assemble the Splunk Lab page once; the result never changes at runtime."""
     # Read all the component files
     components_dir = ROOT / "src" / "components"
     pages_dir = ROOT / "src" / "pages"
@@ -957,314 +883,112 @@ async def get_splunk_lab():
     rules_engine_js_raw = (lib_dir / "rulesEngine.js").read_text(encoding="utf-8")
     
     # Remove ES6 export statements and convert to browser-compatible code
-    # Remove export default and export { ... }
-    normalize_js = normalize_js_raw.replace('export { normalizeSplunkAlert };', '').replace('if (typeof module !== \'undefined\' && module.exports) {', 'if (false) {')  # Keep function, remove exports
-    rules_engine_js = rules_engine_js_raw.replace('export { evaluateRules, loadRulesFromJson };', '').replace('if (typeof module !== \'undefined\' && module.exports) {', 'if (false) {')  # Keep functions, remove exports
-    
+    # (keep the functions, drop exports) — one scan per file.
+    normalize_js = _strip_lib_exports(normalize_js_raw)
+    rules_engine_js = _strip_lib_exports(rules_engine_js_raw)
+
     # Remove import and export statements from JSX files
     # Remove all React import statements - we'll declare hooks once at the top level
-    splunk_input_panel = splunk_input_panel_raw
-    splunk_input_panel = re.sub(r"import\s*{\s*useState[^}]*}\s*from\s*['\"]react['\"];?\s*\n?", "", splunk_input_panel)
-    splunk_input_panel = splunk_input_panel.replace('export default SplunkInputPanel;', '')
-    
-    log_console = log_console_raw
-    log_console = re.sub(r"import\s*{\s*useState[^}]*}\s*from\s*['\"]react['\"];?\s*\n?", "", log_console)
-    log_console = log_console.replace('export default LogConsole;', '')
-    
-    playbook_page = playbook_page_raw
-    playbook_page = re.sub(r"import\s*{\s*useState[^}]*}\s*from\s*['\"]react['\"];?\s*\n?", "", playbook_page)
-    playbook_page = playbook_page.replace('import SplunkInputPanel from \'../components/SplunkInputPanel\';\n', '')
-    playbook_page = playbook_page.replace('import LogConsole from \'../components/LogConsole\';\n', '')
-    playbook_page = playbook_page.replace('import { normalizeSplunkAlert } from \'../lib/normalize\';\n', '')
-    playbook_page = playbook_page.replace('import { evaluateRules, loadRulesFromJson } from \'../lib/rulesEngine\';\n', '')
-    playbook_page = playbook_page.replace('export default PlaybookPage;', '')
-    
-    html_content = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Splunk Normalizer Lab</title>
-    <script crossorigin src="https://unpkg.com/react@18/umd/react.development.js"></script>
-    <script crossorigin src="https://unpkg.com/react-dom@18/umd/react-dom.development.js"></script>
-    <script src="https://unpkg.com/@babel/standalone/babel.min.js"></script>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }}
-        .container {{
-            max-width: 1600px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
-            overflow: hidden;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }}
-        .header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }}
-        .header p {{
-            opacity: 0.9;
-            font-size: 1.1em;
-        }}
-        .content {{
-            padding: 20px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🔬 Splunk Normalizer Lab</h1>
-            <p>Test and normalize Splunk alerts with automated rule evaluation</p>
-        </div>
-        <div class="content">
-            <div id="root"></div>
-        </div>
-    </div>
-    
-    <script type="text/babel">
-        console.log('Script starting...');
-        
-        // Check if React is loaded
-        if (typeof React === 'undefined') {{
-            console.error('React is not loaded');
-            document.getElementById('root').innerHTML = '<div style="padding: 20px; color: red;">Error: React library not loaded</div>';
-        }} else {{
-            console.log('React loaded:', typeof React);
-        }}
-        
-        if (typeof ReactDOM === 'undefined') {{
-            console.error('ReactDOM is not loaded');
-            document.getElementById('root').innerHTML = '<div style="padding: 20px; color: red;">Error: ReactDOM library not loaded</div>';
-        }} else {{
-            console.log('ReactDOM loaded:', typeof ReactDOM);
-        }}
-        
-        // Import React hooks once at the top level (shared by all components)
-        const {{ useState, useEffect }} = React;
-        console.log('Hooks extracted:', typeof useState, typeof useEffect);
-        
-        // Include all library functions first (must be available globally)
-        {normalize_js}
-        {rules_engine_js}
-        console.log('Library functions loaded:', typeof normalizeSplunkAlert, typeof evaluateRules);
-        
-        // Include React components (define them globally)
-        // Components will use the useState/useEffect from above
-        {splunk_input_panel}
-        console.log('SplunkInputPanel loaded:', typeof SplunkInputPanel);
-        
-        {log_console}
-        console.log('LogConsole loaded:', typeof LogConsole);
-        
-        // Main PlaybookPage component (define it globally)
-        {playbook_page}
-        console.log('PlaybookPage loaded:', typeof PlaybookPage);
-        
-        // Render the app once DOM is ready (prevent multiple renders)
-        let rootRendered = false;
-        
-        function renderApp() {{
-            if (rootRendered) {{
-                console.log('App already rendered, skipping...');
-                return;
-            }}
-            
-            try {{
-                console.log('Attempting to render...');
-                const rootElement = document.getElementById('root');
-                if (!rootElement) {{
-                    console.error('Root element not found');
-                    return;
-                }}
-                
-                // Check if PlaybookPage is defined
-                if (typeof PlaybookPage === 'undefined') {{
-                    console.error('PlaybookPage is not defined');
-                    console.log('Available globals:', Object.keys(window).filter(k => k.includes('Page') || k.includes('Panel') || k.includes('Console')));
-                    rootElement.innerHTML = '<div style="padding: 20px; color: red;">Error: PlaybookPage component not found. Check console for details.</div>';
-                    return;
-                }}
-                
-                console.log('PlaybookPage found, creating root...');
-                console.log('PlaybookPage type:', typeof PlaybookPage);
-                const root = ReactDOM.createRoot(rootElement);
-                console.log('Root created, rendering component...');
-                root.render(React.createElement(PlaybookPage));
-                console.log('Component rendered successfully');
-                rootRendered = true;
-            }} catch (error) {{
-                console.error('Error rendering React app:', error);
-                console.error('Error name:', error.name);
-                console.error('Error message:', error.message);
-                console.error('Error stack:', error.stack);
-                const rootElement = document.getElementById('root');
-                if (rootElement) {{
-                    rootElement.innerHTML = '<div style="padding: 20px; color: red;">Error: ' + error.message + '<br>Check console for details.</div>';
-                }}
-            }}
-        }}
-        
-        // Set up DOMContentLoaded listener
-        console.log('Setting up DOMContentLoaded listener...');
-        window.addEventListener('DOMContentLoaded', function() {{
-            console.log('DOMContentLoaded fired!');
-            renderApp();
-        }});
-        
-        // Also try immediate execution if DOM is already loaded
-        if (document.readyState === 'complete' || document.readyState === 'interactive') {{
-            console.log('DOM already loaded, rendering immediately...');
-            renderApp();
-        }}
-    </script>
-</body>
-</html>
+    splunk_input_panel = _RE_EXPORT_DEFAULT.sub(
+        "", _RE_IMPORT_USESTATE.sub("", splunk_input_panel_raw))
+    log_console = _RE_EXPORT_DEFAULT.sub(
+        "", _RE_IMPORT_USESTATE.sub("", log_console_raw))
+    playbook_page = _RE_PAGE_IMPORTS.sub(
+        "", _RE_IMPORT_USESTATE.sub("", playbook_page_raw))
+
+    react_src = _vendor_url("react")
+    react_dom_src = _vendor_url("react-dom")
+    babel_src = _vendor_url("babel")
+
+    html_content = _page_template("splunk_lab.html").substitute(
+        react_src=react_src,
+        react_dom_src=react_dom_src,
+        babel_src=babel_src,
+        normalize_js=normalize_js,
+        rules_engine_js=rules_engine_js,
+        splunk_input_panel=splunk_input_panel,
+        log_console=log_console,
+        playbook_page=playbook_page,
+    )
+    return _inline_babel_to_js(_strip_debug_logs(html_content)).encode("utf-8")
+
+@lru_cache(maxsize=4)
+def _page_variants(builder) -> dict:
+    """Plain, gzip and (when available) brotli bytes for a built page.
+
+    Compressing once at maximum level beats GZipMiddleware recompressing a
+    large identical payload at a lower level on every request.
     """
-    return HTMLResponse(content=html_content)
+    raw = builder()
+    variants = {"identity": raw, "gzip": gzip.compress(raw, compresslevel=9)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(raw, quality=11)
+    return variants
 
-@app.get("/builder", response_class=HTMLResponse)
-async def get_builder():
-    """Return Visual Playbook Builder React page"""
+async def _cached_page(builder) -> dict:
+    """Return a page's encoding variants, running the cold build off the loop.
+
+    The builders read several component files from disk; doing that inline
+    in an async handler would stall every other in-flight request for the
+    duration of the first build. Warm calls skip the thread hop entirely.
+    """
+    if builder.cache_info().currsize:
+        return _page_variants(builder)
+    return await asyncio.to_thread(_page_variants, builder)
+
+def _serve_page(request: Request, variants: dict) -> Response:
+    """Pick the best precompressed variant the client accepts."""
+    accept = request.headers.get("accept-encoding", "")
+    if "br" in accept and "br" in variants:
+        encoding = "br"
+    elif "gzip" in accept:
+        encoding = "gzip"
+    else:
+        encoding = "identity"
+    return Response(
+        content=variants[encoding],
+        media_type="text/html; charset=utf-8",
+        headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+    )
+
+@app.get("/splunk-lab", response_class=HTMLResponse)
+async def get_splunk_lab(request: Request):
+    """Return Splunk Normalizer Lab React page"""
+    # Reading five source files and running the strip/format passes per GET
+    # is identical work every time; serve the bytes built on first request.
+    return _serve_page(request, await _cached_page(_build_splunk_lab_html))
+
+@lru_cache(maxsize=1)
+def _build_builder_html() -> bytes:
+    """Assemble the Visual Playbook Builder page once."""
     pages_dir = ROOT / "src" / "pages"
-    
+
     # Read PlaybookBuilder component file
     playbook_builder_raw = (pages_dir / "PlaybookBuilder.tsx").read_text(encoding="utf-8")
     
     # Remove import and export statements from TSX file
     # Remove all React import statements - we'll declare hooks once at the top level
     playbook_builder = playbook_builder_raw
-    playbook_builder = re.sub(r"import\s*{\s*useState[^}]*}\s*from\s*['\"]react['\"];?\s*\n?", "", playbook_builder)
-    playbook_builder = re.sub(r"import\s*.*\s*from\s*['\"].*['\"];?\s*\n?", "", playbook_builder)
-    playbook_builder = playbook_builder.replace('export default PlaybookBuilder;', '')
-    
-    html_content = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Visual Playbook Builder</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <script crossorigin src="https://unpkg.com/react@18/umd/react.development.js"></script>
-    <script crossorigin src="https://unpkg.com/react-dom@18/umd/react-dom.development.js"></script>
-    <script src="https://unpkg.com/@babel/standalone/babel.min.js"></script>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-        }}
-    </style>
-</head>
-<body>
-    <div id="root"></div>
-    
-    <script type="text/babel">
-        console.log('Script starting...');
-        
-        // Check if React is loaded
-        if (typeof React === 'undefined') {{
-            console.error('React is not loaded');
-            document.getElementById('root').innerHTML = '<div style="padding: 20px; color: red;">Error: React library not loaded</div>';
-        }} else {{
-            console.log('React loaded:', typeof React);
-        }}
-        
-        if (typeof ReactDOM === 'undefined') {{
-            console.error('ReactDOM is not loaded');
-            document.getElementById('root').innerHTML = '<div style="padding: 20px; color: red;">Error: ReactDOM library not loaded</div>';
-        }} else {{
-            console.log('ReactDOM loaded:', typeof ReactDOM);
-        }}
-        
-        // Import React hooks once at the top level (shared by all components)
-        const {{ useState, useEffect }} = React;
-        console.log('Hooks extracted:', typeof useState, typeof useEffect);
-        
-        // Include React component (define it globally)
-        {playbook_builder}
-        console.log('PlaybookBuilder loaded:', typeof PlaybookBuilder);
-        
-        // Render the app once DOM is ready (prevent multiple renders)
-        let rootRendered = false;
-        
-        function renderApp() {{
-            if (rootRendered) {{
-                console.log('App already rendered, skipping...');
-                return;
-            }}
-            
-            try {{
-                console.log('Attempting to render...');
-                const rootElement = document.getElementById('root');
-                if (!rootElement) {{
-                    console.error('Root element not found');
-                    return;
-                }}
-                
-                // Check if PlaybookBuilder is defined
-                if (typeof PlaybookBuilder === 'undefined') {{
-                    console.error('PlaybookBuilder is not defined');
-                    console.log('Available globals:', Object.keys(window).filter(k => k.includes('Builder') || k.includes('Page')));
-                    rootElement.innerHTML = '<div style="padding: 20px; color: red;">Error: PlaybookBuilder component not found. Check console for details.</div>';
-                    return;
-                }}
-                
-                console.log('PlaybookBuilder found, creating root...');
-                console.log('PlaybookBuilder type:', typeof PlaybookBuilder);
-                const root = ReactDOM.createRoot(rootElement);
-                console.log('Root created, rendering component...');
-                root.render(React.createElement(PlaybookBuilder));
-                console.log('Component rendered successfully');
-                rootRendered = true;
-            }} catch (error) {{
-                console.error('Error rendering React app:', error);
-                console.error('Error name:', error.name);
-                console.error('Error message:', error.message);
-                console.error('Error stack:', error.stack);
-                const rootElement = document.getElementById('root');
-                if (rootElement) {{
-                    rootElement.innerHTML = '<div style="padding: 20px; color: red;">Error: ' + error.message + '<br>Check console for details.</div>';
-                }}
-            }}
-        }}
-        
-        // Set up DOMContentLoaded listener
-        console.log('Setting up DOMContentLoaded listener...');
-        window.addEventListener('DOMContentLoaded', function() {{
-            console.log('DOMContentLoaded fired!');
-            renderApp();
-        }});
-        
-        // Also try immediate execution if DOM is already loaded
-        if (document.readyState === 'complete' || document.readyState === 'interactive') {{
-            console.log('DOM already loaded, rendering immediately...');
-            renderApp();
-        }}
-    </script>
-</body>
-</html>
-    """
-    return HTMLResponse(content=html_content)
+    playbook_builder = _RE_IMPORT_USESTATE.sub("", playbook_builder)
+    playbook_builder = _RE_IMPORT_ANY.sub("", playbook_builder)
+    playbook_builder = _RE_EXPORT_DEFAULT.sub("", playbook_builder)
+
+    react_src = _vendor_url("react")
+    react_dom_src = _vendor_url("react-dom")
+    babel_src = _vendor_url("babel")
+    tailwind_src = _vendor_url("tailwind")
+
+    html_content = _page_template("builder.html").substitute(
+        react_src=react_src,
+        react_dom_src=react_dom_src,
+        babel_src=babel_src,
+        tailwind_src=tailwind_src,
+        playbook_builder=playbook_builder,
+    )
+    return _inline_babel_to_js(_strip_debug_logs(html_content)).encode("utf-8")
+
+@app.get("/builder", response_class=HTMLResponse)
+async def get_builder(request: Request):
+    """Return Visual Playbook Builder React page"""
+    return _serve_page(request, await _cached_page(_build_builder_html))
 
@@ -1,16 +1,23 @@
 """
 启动 Web 界面的脚本
 """
+import os
+
 import uvicorn
 
 if __name__ == "__main__":
+    # Reload is development-only: the watcher re-imports the app (and its
+    # module-level caches) on every source change. MINI_SOAR_ENV=development
+    # also selects the React dev builds and keeps the page console logs.
+    dev = os.getenv("MINI_SOAR_ENV", "").lower() == "development"
     uvicorn.run(
         "src.web:app",
         host="127.0.0.1",
         port=8001,
-        reload=True,
+        reload=dev,
+        # uvicorn ignores workers under reload; scale production with
+        # WEB_WORKERS. loop/http stay on auto so uvloop and httptools are
+        # picked up automatically when installed.
+        workers=1 if dev else int(os.getenv("WEB_WORKERS", "1")),
         log_level="info"
     )
-
-
-